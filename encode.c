@@ -0,0 +1,221 @@
+/*
+ * encode.c
+ *
+ * Copyright (c) 2014 Jeremy Garff <jer @ jers.net>
+ *
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without modification, are permitted
+ * provided that the following conditions are met:
+ *
+ *     1.  Redistributions of source code must retain the above copyright notice, this list of
+ *         conditions and the following disclaimer.
+ *     2.  Redistributions in binary form must reproduce the above copyright notice, this list
+ *         of conditions and the following disclaimer in the documentation and/or other materials
+ *         provided with the distribution.
+ *     3.  Neither the name of the owner nor the names of its contributors may be used to endorse
+ *         or promote products derived from this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR
+ * IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+ * FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+ * (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+ * OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+ * OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+ *
+ */
+
+
+#include <stdint.h>
+
+#include "ws2811.h"
+#include "encode.h"
+
+
+// Symbol definitions
+#define SYMBOL_HIGH                              0x6  // 1 1 0
+#define SYMBOL_LOW                               0x4  // 1 0 0
+
+/* Symbol patterns for every byte value, normal and software inverted. */
+static uint32_t symbol_lut[2][256];
+
+/**
+ * Build the byte to symbol pattern lookup tables.  The inverted table is used
+ * for software inversion (PCM and SPI only), as PWM inverts in hardware.
+ *
+ * @returns  None
+ */
+void encode_init(void)
+{
+    int byte, bit;
+
+    for (byte = 0; byte < 256; byte++)
+    {
+        uint32_t pattern = 0;
+
+        for (bit = 7; bit >= 0; bit--)
+        {
+            pattern = (pattern << 3) | ((byte & (1 << bit)) ? SYMBOL_HIGH : SYMBOL_LOW);
+        }
+
+        symbol_lut[0][byte] = pattern;
+        symbol_lut[1][byte] = ~pattern & ((1 << ENCODE_SYMBOL_BITS) - 1);
+    }
+}
+
+/**
+ * Number of color bytes sent per LED of a channel.
+ *
+ * @param    channel  Channel to check.
+ *
+ * @returns  3 for RGB or 4 for RGBW strips.
+ */
+static inline int encode_led_bytes(const ws2811_channel_t *channel)
+{
+    // If our shift mask includes the highest nibble, then we have 4 LEDs, RBGW.
+    return (channel->strip_type & SK6812_SHIFT_WMASK) ? 4 : 3;
+}
+
+/**
+ * Build the color table of a channel: the symbol pattern of every color
+ * component value after scaling by the channel brightness and gamma
+ * correction.
+ *
+ * @param    channel  Channel to build the table for.
+ * @param    invert   Non-zero to use the software inverted symbols.
+ * @param    lut      Output table, 256 entries.
+ *
+ * @returns  None
+ */
+void encode_color_lut(const ws2811_channel_t *channel, int invert, uint32_t *lut)
+{
+    const uint32_t *symbols = symbol_lut[invert ? 1 : 0];
+    const int scale = (channel->brightness & 0xff) + 1;
+    int x;
+
+    for (x = 0; x < 256; x++)
+    {
+        lut[x] = symbols[channel->gamma[(x * scale) >> 8]];
+    }
+}
+
+/**
+ * Look up the symbol patterns of each color component of a LED value, in the
+ * order given by the channel strip type.
+ *
+ * @param    channel  Channel the LED belongs to.
+ * @param    lut      Color table from encode_color_lut().
+ * @param    led      LED color value.
+ * @param    pattern  Output symbol patterns, 4 entries.
+ *
+ * @returns  Number of color bytes, 3 or 4.
+ */
+static inline int led_patterns(const ws2811_channel_t *channel, const uint32_t *lut,
+                               ws2811_led_t led, uint32_t *pattern)
+{
+    pattern[0] = lut[(led >> channel->rshift) & 0xff]; // red
+    pattern[1] = lut[(led >> channel->gshift) & 0xff]; // green
+    pattern[2] = lut[(led >> channel->bshift) & 0xff]; // blue
+    pattern[3] = lut[(led >> channel->wshift) & 0xff]; // white
+
+    return encode_led_bytes(channel);
+}
+
+/**
+ * Encode LEDs first up to (not including) last of a channel into 32-bit words,
+ * most significant bit first.  The stream for the whole channel starts at the
+ * top bit of the first word; bits of the edge words outside the range are
+ * left untouched, so a range can be re-encoded into a previously encoded
+ * stream.
+ *
+ * @param    channel  Channel to encode.
+ * @param    lut      Color table from encode_color_lut().
+ * @param    words    First word of the channel's bitstream.
+ * @param    stride   Distance in words between consecutive words of the
+ *                    channel (2 for interleaved PWM channels, 1 for PCM).
+ * @param    first    First LED to encode.
+ * @param    last     One past the last LED to encode.
+ *
+ * @returns  None
+ */
+void encode_words(const ws2811_channel_t *channel, const uint32_t *lut,
+                  volatile uint32_t *words, int stride, int first, int last)
+{
+    const int led_bits = encode_led_bytes(channel) * ENCODE_SYMBOL_BITS;
+    const uint64_t start_bit = (uint64_t)first * led_bits;
+    uint64_t acc = 0;
+    int bits = start_bit % 32;
+    int i, j;
+
+    words += (start_bit / 32) * stride;
+
+    // Carry over the bits of the previous LED sharing the first word
+    if (bits)
+    {
+        acc = *words >> (32 - bits);
+    }
+
+    for (i = first; i < last; i++)
+    {
+        uint32_t pattern[4];
+        int array_size = led_patterns(channel, lut, channel->leds[i], pattern);
+
+        for (j = 0; j < array_size; j++)
+        {
+            acc = (acc << ENCODE_SYMBOL_BITS) | pattern[j];
+            bits += ENCODE_SYMBOL_BITS;
+
+            if (bits >= 32)
+            {
+                bits -= 32;
+                *words = (uint32_t)(acc >> bits);
+                words += stride;
+            }
+        }
+    }
+
+    // Keep the bits of the next LED sharing the last word
+    if (bits)
+    {
+        uint32_t keep = 0xffffffff >> bits;
+
+        *words = (uint32_t)(acc << (32 - bits)) | (*words & keep);
+    }
+}
+
+/**
+ * Encode LEDs first up to (not including) last of a channel into bytes, most
+ * significant bit first.  Each color byte expands to exactly 3 bytes, so the
+ * stream stays byte aligned.
+ *
+ * @param    channel  Channel to encode.
+ * @param    lut      Color table from encode_color_lut().
+ * @param    bytes    First byte of the channel's bitstream.
+ * @param    first    First LED to encode.
+ * @param    last     One past the last LED to encode.
+ *
+ * @returns  None
+ */
+void encode_bytes(const ws2811_channel_t *channel, const uint32_t *lut,
+                  volatile uint8_t *bytes, int first, int last)
+{
+    int i, j;
+
+    bytes += first * encode_led_bytes(channel) * 3;
+
+    for (i = first; i < last; i++)
+    {
+        uint32_t pattern[4];
+        int array_size = led_patterns(channel, lut, channel->leds[i], pattern);
+
+        for (j = 0; j < array_size; j++)
+        {
+            bytes[0] = pattern[j] >> 16;
+            bytes[1] = pattern[j] >> 8;
+            bytes[2] = pattern[j];
+            bytes += 3;
+        }
+    }
+}
@@ -0,0 +1,62 @@
+/*
+ * encode.h
+ *
+ * Copyright (c) 2014 Jeremy Garff <jer @ jers.net>
+ *
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without modification, are permitted
+ * provided that the following conditions are met:
+ *
+ *     1.  Redistributions of source code must retain the above copyright notice, this list of
+ *         conditions and the following disclaimer.
+ *     2.  Redistributions in binary form must reproduce the above copyright notice, this list
+ *         of conditions and the following disclaimer in the documentation and/or other materials
+ *         provided with the distribution.
+ *     3.  Neither the name of the owner nor the names of its contributors may be used to endorse
+ *         or promote products derived from this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR
+ * IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+ * FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+ * (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+ * OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+ * OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+ *
+ */
+
+
+#ifndef __ENCODE_H__
+#define __ENCODE_H__
+
+#include <stdint.h>
+
+#include "ws2811.h"
+
+
+/*
+ * Every LED color bit is sent as 3 symbols, so each color byte expands to a
+ * 24-bit symbol pattern.  The patterns for all 256 byte values are computed
+ * once and the bitstream is then assembled a word (PWM/PCM) or a byte (SPI)
+ * at a time instead of one symbol bit at a time.
+ *
+ * Brightness scaling and gamma correction are folded into a per channel
+ * color table (encode_color_lut()), mapping a color component straight to
+ * its symbol pattern.  It only needs rebuilding when they change.
+ */
+
+#define ENCODE_SYMBOL_BITS                       24   // 8 bits * 3 symbols per color byte
+
+void encode_init(void);                                                //< Build the lookup tables
+void encode_color_lut(const ws2811_channel_t *channel, int invert,
+                      uint32_t *lut);                                  //< Brightness, gamma & symbol table
+void encode_words(const ws2811_channel_t *channel, const uint32_t *lut,
+                  volatile uint32_t *words, int stride,
+                  int first, int last);                                //< PWM & PCM word packing
+void encode_bytes(const ws2811_channel_t *channel, const uint32_t *lut,
+                  volatile uint8_t *bytes, int first, int last);       //< SPI byte packing
+
+
+#endif /* __ENCODE_H__ */
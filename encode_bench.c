@@ -0,0 +1,346 @@
+/*
+ * encode_bench.c
+ *
+ * Copyright (c) 2014 Jeremy Garff <jer @ jers.net>
+ *
+ * All rights reserved.
+ *
+ * Redistribution and use in source and binary forms, with or without modification, are permitted
+ * provided that the following conditions are met:
+ *
+ *     1.  Redistributions of source code must retain the above copyright notice, this list of
+ *         conditions and the following disclaimer.
+ *     2.  Redistributions in binary form must reproduce the above copyright notice, this list
+ *         of conditions and the following disclaimer in the documentation and/or other materials
+ *         provided with the distribution.
+ *     3.  Neither the name of the owner nor the names of its contributors may be used to endorse
+ *         or promote products derived from this software without specific prior written permission.
+ *
+ * THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY EXPRESS OR
+ * IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+ * FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER BE
+ * LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+ * (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+ * OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+ * CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT
+ * OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+ *
+ */
+
+
+/*
+ * Timing harness for the LED bitstream encoder.  Runs the previous bit at a
+ * time encoder and the lookup table encoder on plain memory, checks that both
+ * produce identical bitstreams, also when only a changed span of LEDs is
+ * re-encoded, and reports the time per frame.  No hardware
+ * access is needed, so this also runs on an x86 Linux host:
+ *
+ *     gcc -O2 -o encode_bench encode_bench.c encode.c
+ *     ./encode_bench [led_count] [iterations]
+ */
+
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+
+#include "ws2811.h"
+#include "encode.h"
+
+
+#define DEFAULT_LED_COUNT       1000
+#define DEFAULT_ITERATIONS      200
+
+// Driver mode definitions, as in ws2811.c
+#define PWM     1
+#define PCM     2
+#define SPI     3
+
+// Symbol definitions
+#define SYMBOL_HIGH             0x6  // 1 1 0
+#define SYMBOL_LOW              0x4  // 1 0 0
+#define SYMBOL_HIGH_INV         0x1  // 0 0 1
+#define SYMBOL_LOW_INV          0x3  // 0 1 1
+
+typedef struct
+{
+    const char *name;
+    int driver_mode;
+    int invert;
+    int strip_type;
+} bench_case_t;
+
+static const bench_case_t cases[] =
+{
+    { "PWM RGB",         PWM, 0, WS2811_STRIP_GRB },
+    { "PWM RGBW",        PWM, 0, SK6812_STRIP_GRBW },
+    { "PCM RGB",         PCM, 0, WS2811_STRIP_GRB },
+    { "PCM RGB invert",  PCM, 1, WS2811_STRIP_GRB },
+    { "SPI RGB",         SPI, 0, WS2811_STRIP_GRB },
+    { "SPI RGBW invert", SPI, 1, SK6812_STRIP_GRBW },
+};
+
+/**
+ * The bit at a time encoder previously used by ws2811_render(), for one channel.
+ */
+static void legacy_encode(const ws2811_channel_t *channel, int driver_mode, int chan,
+                          volatile uint8_t *pxl_raw)
+{
+    int bitpos = (driver_mode == SPI ? 7 : 31);
+    int wordpos = chan; // PWM & PCM
+    int bytepos = 0;    // SPI
+    const int scale = (channel->brightness & 0xff) + 1;
+    uint8_t array_size = 3;
+    int i, k, l;
+    unsigned j;
+
+    if (channel->strip_type & SK6812_SHIFT_WMASK)
+    {
+        array_size = 4;
+    }
+
+    for (i = 0; i < channel->count; i++)                // Led
+    {
+        uint8_t color[] =
+        {
+            channel->gamma[(((channel->leds[i] >> channel->rshift) & 0xff) * scale) >> 8], // red
+            channel->gamma[(((channel->leds[i] >> channel->gshift) & 0xff) * scale) >> 8], // green
+            channel->gamma[(((channel->leds[i] >> channel->bshift) & 0xff) * scale) >> 8], // blue
+            channel->gamma[(((channel->leds[i] >> channel->wshift) & 0xff) * scale) >> 8], // white
+        };
+
+        for (j = 0; j < array_size; j++)               // Color
+        {
+            for (k = 7; k >= 0; k--)                   // Bit
+            {
+                uint8_t symbol = SYMBOL_LOW;
+                if ((driver_mode != PWM) && channel->invert) symbol = SYMBOL_LOW_INV;
+
+                if (color[j] & (1 << k))
+                {
+                    symbol = SYMBOL_HIGH;
+                    if ((driver_mode != PWM) && channel->invert) symbol = SYMBOL_HIGH_INV;
+                }
+
+                for (l = 2; l >= 0; l--)               // Symbol
+                {
+                    volatile uint32_t *wordptr = &((volatile uint32_t *)pxl_raw)[wordpos];
+                    volatile uint8_t *byteptr = &pxl_raw[bytepos];
+
+                    if (driver_mode == SPI)
+                    {
+                        *byteptr &= ~(1 << bitpos);
+                        if (symbol & (1 << l))
+                        {
+                            *byteptr |= (1 << bitpos);
+                        }
+                    }
+                    else
+                    {
+                        *wordptr &= ~(1 << bitpos);
+                        if (symbol & (1 << l))
+                        {
+                            *wordptr |= (1 << bitpos);
+                        }
+                    }
+
+                    bitpos--;
+                    if (bitpos < 0)
+                    {
+                        if (driver_mode == SPI)
+                        {
+                            bytepos++;
+                            bitpos = 7;
+                        }
+                        else
+                        {
+                            wordpos += (driver_mode == PWM ? 2 : 1);
+                            bitpos = 31;
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+/* Color tables for the case being run, normal and software inverted. */
+static uint32_t bench_lut[2][256];
+
+static void lut_encode_range(const ws2811_channel_t *channel, int driver_mode, int chan,
+                             volatile uint8_t *pxl_raw, int first, int last)
+{
+    switch (driver_mode)
+    {
+    case PWM:
+        encode_words(channel, bench_lut[0], (volatile uint32_t *)pxl_raw + chan, RPI_PWM_CHANNELS,
+                     first, last);
+        break;
+    case PCM:
+        encode_words(channel, bench_lut[channel->invert ? 1 : 0], (volatile uint32_t *)pxl_raw, 1,
+                     first, last);
+        break;
+    case SPI:
+        encode_bytes(channel, bench_lut[channel->invert ? 1 : 0], pxl_raw, first, last);
+        break;
+    }
+}
+
+static void lut_encode(const ws2811_channel_t *channel, int driver_mode, int chan,
+                       volatile uint8_t *pxl_raw)
+{
+    lut_encode_range(channel, driver_mode, chan, pxl_raw, 0, channel->count);
+}
+
+/**
+ * Change a span of LEDs in the middle of the strip, re-encode only that span
+ * on top of the full stream in lut_buf and compare with a full legacy encode.
+ * The LED values and both buffers are restored afterwards.
+ */
+static int check_partial(ws2811_channel_t *channel, int driver_mode,
+                         uint8_t *legacy_buf, uint8_t *lut_buf, size_t buf_size)
+{
+    int first = channel->count / 3;
+    int last = first + 5 < channel->count ? first + 5 : channel->count;
+    ws2811_led_t saved[5];
+    int i, ok;
+
+    for (i = first; i < last; i++)
+    {
+        saved[i - first] = channel->leds[i];
+        channel->leds[i] = ~channel->leds[i];
+    }
+
+    lut_encode_range(channel, driver_mode, 0, lut_buf, first, last);
+    legacy_encode(channel, driver_mode, 0, legacy_buf);
+    ok = !memcmp(legacy_buf, lut_buf, buf_size);
+
+    for (i = first; i < last; i++)
+    {
+        channel->leds[i] = saved[i - first];
+    }
+    lut_encode_range(channel, driver_mode, 0, lut_buf, first, last);
+    legacy_encode(channel, driver_mode, 0, legacy_buf);
+
+    return ok;
+}
+
+static double now_us(void)
+{
+    struct timespec t;
+
+    clock_gettime(CLOCK_MONOTONIC, &t);
+
+    return t.tv_sec * 1000000.0 + t.tv_nsec / 1000.0;
+}
+
+static double time_encoder(void (*encoder)(const ws2811_channel_t *, int, int, volatile uint8_t *),
+                           const ws2811_channel_t *channel, int driver_mode,
+                           uint8_t *buf, int iterations)
+{
+    double start;
+    int i;
+
+    start = now_us();
+    for (i = 0; i < iterations; i++)
+    {
+        encoder(channel, driver_mode, 0, buf);
+    }
+
+    return (now_us() - start) / iterations;
+}
+
+int main(int argc, char *argv[])
+{
+    int led_count = (argc > 1) ? atoi(argv[1]) : DEFAULT_LED_COUNT;
+    int iterations = (argc > 2) ? atoi(argv[2]) : DEFAULT_ITERATIONS;
+    // 4 colors * 3 symbol bytes per LED, times 2 for interleaved PWM words
+    size_t buf_size = ((size_t)led_count * 4 * 3 + 8) * RPI_PWM_CHANNELS;
+    ws2811_led_t *leds;
+    uint8_t gamma[256];
+    uint8_t *legacy_buf, *lut_buf;
+    int failed = 0;
+    unsigned i;
+
+    if (led_count <= 0 || iterations <= 0)
+    {
+        fprintf(stderr, "Usage: %s [led_count] [iterations]\n", argv[0]);
+        return 1;
+    }
+
+    leds = malloc(sizeof(ws2811_led_t) * led_count);
+    legacy_buf = malloc(buf_size);
+    lut_buf = malloc(buf_size);
+    if (!leds || !legacy_buf || !lut_buf)
+    {
+        fprintf(stderr, "Out of memory\n");
+        return 1;
+    }
+
+    srand(1);
+    for (i = 0; i < (unsigned)led_count; i++)
+    {
+        leds[i] = ((uint32_t)rand() << 16) ^ (uint32_t)rand();
+    }
+    for (i = 0; i < 256; i++)
+    {
+        // Something other than the identity, to check the color tables
+        gamma[i] = (i * i + 254) / 255;
+    }
+
+    encode_init();
+
+    printf("%d LEDs, %d iterations\n", led_count, iterations);
+    printf("%-18s %12s %12s %8s\n", "mode", "legacy us", "lut us", "speedup");
+
+    for (i = 0; i < sizeof(cases) / sizeof(cases[0]); i++)
+    {
+        const bench_case_t *bench = &cases[i];
+        ws2811_channel_t channel =
+        {
+            .count = led_count,
+            .invert = bench->invert,
+            .strip_type = bench->strip_type,
+            .leds = leds,
+            .brightness = 200,
+            .wshift = (bench->strip_type >> 24) & 0xff,
+            .rshift = (bench->strip_type >> 16) & 0xff,
+            .gshift = (bench->strip_type >> 8) & 0xff,
+            .bshift = (bench->strip_type >> 0) & 0xff,
+            .gamma = gamma,
+        };
+        double legacy_us, lut_us;
+
+        // Built once per brightness/gamma change by the driver, so not timed
+        encode_color_lut(&channel, 0, bench_lut[0]);
+        encode_color_lut(&channel, 1, bench_lut[1]);
+        memset(legacy_buf, 0, buf_size);
+        memset(lut_buf, 0, buf_size);
+        legacy_encode(&channel, bench->driver_mode, 0, legacy_buf);
+        lut_encode(&channel, bench->driver_mode, 0, lut_buf);
+        if (memcmp(legacy_buf, lut_buf, buf_size))
+        {
+            printf("%-18s bitstream mismatch\n", bench->name);
+            failed = 1;
+            continue;
+        }
+        if (!check_partial(&channel, bench->driver_mode, legacy_buf, lut_buf, buf_size))
+        {
+            printf("%-18s partial bitstream mismatch\n", bench->name);
+            failed = 1;
+            continue;
+        }
+
+        legacy_us = time_encoder(legacy_encode, &channel, bench->driver_mode, legacy_buf, iterations);
+        lut_us = time_encoder(lut_encode, &channel, bench->driver_mode, lut_buf, iterations);
+
+        printf("%-18s %12.1f %12.1f %7.1fx\n", bench->name, legacy_us, lut_us, legacy_us / lut_us);
+    }
+
+    free(lut_buf);
+    free(legacy_buf);
+    free(leds);
+
+    return failed;
+}
@@ -0,0 +1,174 @@
+""" asyncio version of the executor server, built on grpc.aio.
+
+The RPC handlers and the render loop share one event loop instead of a thread pool plus a render
+thread.  Everything touching the strip (computing frames and the blocking show()) runs on a single
+worker thread, which keeps it the strip's only user; the loop only schedules frames and commands.
+"""
+
+import asyncio
+from concurrent import futures
+import inspect
+import logging
+import queue
+
+import grpc
+
+import message_pb2
+import message_pb2_grpc
+from . import light
+from .commands import BrightnessCommand
+from .executor_server import Executor
+from .message import decode
+
+
+logger = logging.getLogger(light.LOGGER_NAME)
+
+
+class AsyncRenderer:
+    """ Applies the commands from light.commands on the event loop; animations run as a task,
+    cancelled as soon as a command other than a brightness change is submitted.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.strip_executor = futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='render')
+        self.wake = asyncio.Event()
+        self.animation = None
+
+    def call(self, fn, *args):
+        """ Run fn(*args) on the thread owning the strip. """
+        return self.loop.run_in_executor(self.strip_executor, fn, *args)
+
+    def notify(self, command):
+        """ light.on_submit hook; called on the event loop by the RPC handlers. """
+        if self.interrupts(command) and self.animation is not None:
+            self.animation.cancel()
+        self.wake.set()
+
+    async def run(self):
+        while True:
+            await self.wake.wait()
+            self.wake.clear()
+
+            while True:
+                try:
+                    command = light.commands.get_nowait()
+                except queue.Empty:
+                    break
+
+                if command is None:
+                    await self.stop_animation()
+                    return
+                await self.apply(command)
+
+    @staticmethod
+    def interrupts(command):
+        # Brightness changes, and scenes looking just like the one displayed, leave it running:
+        return not isinstance(command, BrightnessCommand) and not light.is_displayed(command)
+
+    async def apply(self, command):
+        if self.interrupts(command):
+            await self.stop_animation()
+            # Cleared on the strip's thread, so not before an animation still running there
+            #   (Meiosis) has seen it set:
+            await self.call(light.commands.clear_interrupt, light.stop_event, command.sequence)
+
+        try:
+            animation = await self.call(light.start_command, command)
+        except Exception:
+            logger.exception('Failed to apply {}'.format(type(command).__name__))
+            animation = None
+        light.mark_applied(command)
+
+        if animation is not None:
+            self.animation = self.loop.create_task(self.animate(*animation))
+
+    async def stop_animation(self):
+        if self.animation is not None:
+            self.animation.cancel()
+            try:
+                await self.animation
+            except asyncio.CancelledError:
+                pass
+            self.animation = None
+
+    async def animate(self, colors, animation):
+        logger.info('Received animation {} in animate'.format(animation))
+        # Commands are picked up by run(), so nothing to do between frames:
+        light.frame_scheduler = scheduler = light.make_frame_scheduler(animation)
+
+        try:
+            if light.TIME_BASED_ANIMATIONS and animation in light.TIMED_ANIMATIONS:
+                render = await self.call(light.TIMED_ANIMATIONS[animation], colors)
+                await scheduler.run_timed_async(render, self.call)
+                return
+
+            while not light.stop_event.is_set():
+                scene = light.ANIMATIONS[animation]
+                if inspect.isgeneratorfunction(scene):
+                    await scheduler.run_async(scene(colors), self.call)
+                else:
+                    # Meiosis still paces itself, and returns once stop_event is set:
+                    await self.call(scene, colors)
+        except Exception:
+            logger.exception('Animation {} failed'.format(animation))
+        finally:
+            light.log_animation_stats(animation, scheduler)
+
+
+class AsyncExecutor(message_pb2_grpc.ExecutorServicer):
+    async def ApplyChange(self, request, context):
+        try:
+            sequence = light.message_handler(decode(request))
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        return message_pb2.ChangeReply(message='success', sequence=sequence)
+
+    async def ApplyChanges(self, request, context):
+        return Executor.QueueChanges(request)
+
+    async def GetStatus(self, request, context):
+        return message_pb2.StatusReply(**light.get_status())
+
+    async def StreamFrames(self, request_iterator, context):
+        stream = light.open_stream()
+        try:
+            async for frame in request_iterator:
+                stream.push(frame.pixels, frame.gzipped, frame.indices)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        finally:
+            stream.close()
+        return message_pb2.StreamSummary(**stream.stats())
+
+    async def Control(self, request_iterator, context):
+        async for request in request_iterator:
+            yield Executor.QueueChange(request)
+
+
+async def serve_async(clear=False):
+    renderer = AsyncRenderer()
+    light.on_submit = renderer.notify
+    render_task = asyncio.create_task(renderer.run())
+
+    server = grpc.aio.server()
+    message_pb2_grpc.add_ExecutorServicer_to_server(AsyncExecutor(), server)
+    server.add_insecure_port('[::]:50051')
+    await server.start()
+    logger.info('Started asyncio server.')
+
+    try:
+        await server.wait_for_termination()
+    finally:
+        await server.stop(None)
+        render_task.cancel()
+        light.stop_event.set()
+        await renderer.stop_animation()
+        # Let the frame in progress finish; nothing else uses the strip after this:
+        renderer.strip_executor.shutdown(wait=True)
+        if clear and light.strip is not None:
+            light.fastWipe()
+
+
+def serve(clear=False):
+    asyncio.run(serve_async(clear))
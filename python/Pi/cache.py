@@ -0,0 +1,80 @@
+""" Bounded LRU cache for values derived from scene parameters (parsed colors, fade tables),
+so flipping between the same handful of scenes doesn't recompute them on every start.
+"""
+
+from collections import OrderedDict
+import sys
+import threading
+
+
+def deep_sizeof(value):
+    """ Approximate memory footprint of value in bytes, following tuples and lists. """
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        size += sum(deep_sizeof(item) for item in value)
+    return size
+
+
+class LRUCache:
+    """ Least-recently-used cache bounded both by entry count and by an approximate memory
+    budget in bytes; the oldest entries are evicted until a new entry fits in both.
+
+    Values are shared between callers, so store immutable ones (tuples rather than lists).
+    """
+
+    def __init__(self, max_entries=32, max_bytes=1024 * 1024, sizeof=deep_sizeof):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """ The cached value for key, calling compute() to build and cache it on a miss. """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        value = compute()
+        size = self.sizeof(value)
+
+        with self._lock:
+            # Too big to ever fit; hand it back without evicting everything else for it:
+            if size > self.max_bytes:
+                return value
+
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            while self._entries and (len(self._entries) >= self.max_entries or self._bytes + size > self.max_bytes):
+                self._bytes -= self._entries.popitem(last=False)[1][1]
+                self.evictions += 1
+
+            self._entries[key] = (value, size)
+            self._bytes += size
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
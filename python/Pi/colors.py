@@ -0,0 +1,95 @@
+""" Shared color helpers: 256-entry uint32 lookup tables for the rainbow wheel and for
+palettes built from a scene's hex colors, so effects can map a whole index array to
+colors with a single gather.
+"""
+
+import re
+
+import numpy as np
+
+
+TABLE_SIZE = 256
+
+_HEX_COLOR = re.compile(r'#?([0-9a-fA-F]{6})')
+
+
+def pack(red, green, blue, white=0):
+    """ Vectorized neopixel.Color(); takes scalars or arrays of components. """
+    return ((np.asarray(white, dtype=np.uint32) << 24) |
+            (np.asarray(red, dtype=np.uint32) << 16) |
+            (np.asarray(green, dtype=np.uint32) << 8) |
+            np.asarray(blue, dtype=np.uint32))
+
+
+def hex_to_rgb(hex_color):
+    """ '#rrggbb' (or 'rrggbb') -> (red, green, blue) """
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+
+def parse_hex(hex_color):
+    """ '#rrggbb' (or 'rrggbb') -> packed 0xrrggbb; raises ValueError if it isn't one. """
+    match = _HEX_COLOR.fullmatch(hex_color)
+    if match is None:
+        raise ValueError('{!r} is not a #rrggbb color'.format(hex_color))
+    return int(match.group(1), 16)
+
+
+def unpack_rgb_bytes(data):
+    """ 3 bytes (red, green, blue) per color -> list of packed 0xrrggbb """
+    if len(data) % 3:
+        raise ValueError('{} bytes is not a whole number of colors'.format(len(data)))
+    channels = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+    return pack(channels[:, 0], channels[:, 1], channels[:, 2]).tolist()
+
+
+def to_rgb(color):
+    """ Hex color string or packed 0xrrggbb -> (red, green, blue) """
+    if isinstance(color, str):
+        return hex_to_rgb(color)
+    return ((color >> 16) & 255, (color >> 8) & 255, color & 255)
+
+
+def _build_wheel():
+    """ Rainbow colors across 0-255 positions. """
+    pos = np.arange(TABLE_SIZE, dtype=np.int32)
+    red = np.select([pos < 85, pos < 170], [pos * 3, 255 - (pos - 85) * 3], 0)
+    green = np.select([pos < 85, pos < 170], [255 - pos * 3, 0], (pos - 170) * 3)
+    blue = np.select([pos < 85, pos < 170], [0, (pos - 85) * 3], 255 - (pos - 170) * 3)
+    return pack(red, green, blue)
+
+
+WHEEL = _build_wheel()
+WHEEL.flags.writeable = False
+_WHEEL_LIST = WHEEL.tolist()
+
+
+def wheel(pos):
+    """ Generate rainbow colors across 0-255 positions. """
+    return _WHEEL_LIST[pos & 255]
+
+
+def palette(hex_colors, size=TABLE_SIZE, cyclic=True, grb=False):
+    """ Gradient lookup table of size entries running evenly through hex_colors (hex
+    strings or packed 0xrrggbb).
+
+    With cyclic, the last color blends back into the first so the table can be
+    indexed modulo its size.  With grb, red and green are swapped when packing,
+    as light.py does for our strips.
+    """
+    rgb = np.array([to_rgb(color) for color in hex_colors], dtype=np.float64)
+    if cyclic:
+        rgb = np.vstack([rgb, rgb[:1]])
+
+    stops = np.linspace(0, size, len(rgb)) if cyclic else np.linspace(0, size - 1, len(rgb))
+    positions = np.arange(size)
+    red, green, blue = (np.rint(np.interp(positions, stops, rgb[:, c])).astype(np.uint32) for c in range(3))
+
+    table = pack(green, red, blue) if grb else pack(red, green, blue)
+    table.flags.writeable = False
+    return table
+
+
+def lookup(table, indices):
+    """ Map an array of indices to colors, wrapping around the table. """
+    return table[np.asarray(indices) % len(table)]
@@ -0,0 +1,160 @@
+""" Typed commands for the render thread (see light.render_loop), built from incoming messages. """
+
+import queue
+import threading
+import time
+
+from .message import content_hash
+
+
+class Command:
+    def __init__(self):
+        # For measuring the time until the command takes effect:
+        self.received_at = time.monotonic()
+        # Set when queued, see CommandMailbox.put():
+        self.sequence = 0
+
+
+class SceneCommand(Command):
+    """ Show the scene described by a SceneMessage, at brightness instead of the scene's
+    defaultBrightness if given.
+    """
+    def __init__(self, message, brightness=None):
+        super().__init__()
+        self.message = message
+        self.brightness = brightness
+        # Computed here, on the thread receiving the message (see message.content_hash):
+        self.content_hash = content_hash(message, brightness) if message is not None else None
+
+
+class StreamCommand(SceneCommand):
+    """ Show the frames pushed into a FrameStream, in place of a scene, until it is closed. """
+    def __init__(self, stream):
+        super().__init__(None)
+        self.stream = stream
+
+
+class BrightnessCommand(Command):
+    """ Change the brightness of whatever is showing, without interrupting it. """
+    def __init__(self, brightness):
+        super().__init__()
+        self.brightness = brightness
+
+
+class OffCommand(Command):
+    """ End the current scene and turn the lights off. """
+    pass
+
+
+def coalesce(commands):
+    """ The one command with the same effect as applying commands in order, so they can be applied
+    together: the last scene or off, with the brightness of a later brightness change folded into
+    the scene.  As in CommandMailbox, a scene discards an earlier brightness (it sets its own), and
+    so does an off.  None if commands is empty.
+    """
+    result = None
+    for command in commands:
+        if not isinstance(command, BrightnessCommand) or result is None or isinstance(result, BrightnessCommand):
+            result = command
+        elif isinstance(result, SceneCommand) and not isinstance(result, StreamCommand):
+            result = SceneCommand(result.message, command.brightness)
+    return result
+
+
+class CommandMailbox:
+    """ Pending commands for the render thread, coalesced so only what still matters is applied:
+    the newest scene and the newest brightness replace older ones ('coalesced'), an off discards
+    everything queued before it and a scene discards an earlier brightness, as it sets its own
+    ('dropped').  get() hands out off, then scene, then brightness.
+
+    Mirrors the parts of queue.Queue the render thread uses; putting None asks it to stop: get()
+    hands out None once, after a pending off.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._off = None
+        self._scene = None
+        self._brightness = None
+        # Sequence number of the newest command which interrupted the render thread, see put():
+        self._interrupted = 0
+
+        self.received = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def put(self, command, interrupt=None):
+        """ Queue a command, numbering it; returns its sequence number.  If given, the interrupt
+        event is set along with queueing it, see clear_interrupt().
+        """
+        with self._condition:
+            self.received += 1
+            sequence = self.received
+
+            if interrupt is not None:
+                self._interrupted = sequence
+                interrupt.set()
+
+            if command is None:
+                self._shutdown = True
+            elif isinstance(command, OffCommand):
+                self.dropped += (self._scene is not None) + (self._brightness is not None)
+                self.coalesced += self._off is not None
+                self._off, self._scene, self._brightness = command, None, None
+            elif isinstance(command, SceneCommand):
+                self.coalesced += self._scene is not None
+                self.dropped += self._brightness is not None
+                self._scene, self._brightness = command, None
+            else:
+                self.coalesced += self._brightness is not None
+                self._brightness = command
+
+            if command is not None:
+                command.sequence = sequence
+            self._condition.notify()
+        return sequence
+
+    def get(self, block=True, timeout=None):
+        """ The next command, or None (just once) when asked to stop.  Raises queue.Empty if there
+        is none (after waiting up to timeout seconds if block is set).
+        """
+        with self._condition:
+            if block:
+                self._condition.wait_for(self._pending, timeout)
+            if self._off is not None:
+                command, self._off = self._off, None
+                return command
+            if self._shutdown:
+                self._shutdown = False
+                return None
+
+            for slot in ('_scene', '_brightness'):
+                command = getattr(self, slot)
+                if command is not None:
+                    setattr(self, slot, None)
+                    return command
+            raise queue.Empty
+
+    def clear_interrupt(self, interrupt, sequence):
+        """ Clear the interrupt event before applying the command numbered sequence, unless a newer
+        command set it, so it can't be cleared between that command being queued and taken.
+        """
+        with self._condition:
+            if self._interrupted <= sequence:
+                interrupt.clear()
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def depth(self):
+        """ Commands waiting for the render thread; at most one of each kind, after coalescing. """
+        with self._condition:
+            return sum(command is not None for command in (self._off, self._scene, self._brightness))
+
+    def _pending(self):
+        return self._shutdown or any((self._off, self._scene, self._brightness))
+
+    def stats(self):
+        with self._condition:
+            return {'received': self.received, 'coalesced': self.coalesced, 'dropped': self.dropped}
@@ -0,0 +1,67 @@
+""" Vectorized effects: each function returns a whole frame as a NumPy uint32 array,
+ready to be written to the strip with a single Adafruit_NeoPixel.setPixels() call.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    from .colors import WHEEL, lookup
+except ImportError:  # Loaded as a top-level module, e.g. by effects_bench.py
+    from colors import WHEEL, lookup
+
+
+@lru_cache(maxsize=8)
+def _positions(num_pixels):
+    positions = np.arange(num_pixels, dtype=np.int32)
+    positions.flags.writeable = False
+    return positions
+
+
+@lru_cache(maxsize=8)
+def _cycle_positions(num_pixels):
+    positions = _positions(num_pixels) * 256 // num_pixels
+    positions.flags.writeable = False
+    return positions
+
+
+def fill(num_pixels, color):
+    return np.full(num_pixels, color, dtype=np.uint32)
+
+
+def rainbow(num_pixels, j):
+    """ Frame j of light.rainbow(). """
+    return WHEEL[(_positions(num_pixels) + j) & 255]
+
+
+def rainbow_cycle(num_pixels, j):
+    """ Frame j of light.rainbowCycle(). """
+    return WHEEL[(_cycle_positions(num_pixels) + j) & 255]
+
+
+def palette_cycle(num_pixels, table, j):
+    """ A 256-entry palette (see colors.palette()) spread across all pixels, shifted by j. """
+    return lookup(table, _cycle_positions(num_pixels) + j)
+
+
+def theater_chase(num_pixels, color, q):
+    """ Every third pixel from q lit with color, the rest dark. """
+    frame = np.zeros(num_pixels, dtype=np.uint32)
+    frame[q::3] = color
+    return frame
+
+
+def theater_chase_rainbow(num_pixels, j, q):
+    """ Frame (j, q) of light.theaterChaseRainbow(). """
+    frame = np.zeros(num_pixels, dtype=np.uint32)
+    lit = frame[q::3]
+    lit[:] = WHEEL[(_positions(num_pixels)[0:len(lit) * 3:3] + j) % 255]
+    return frame
+
+
+def segments(num_pixels, colors):
+    """ Even(ish) runs of each color, the remainder going to the last one, as in light.paint_with_colors(). """
+    colors = np.asarray(colors, dtype=np.uint32)
+    range_per_color = max(num_pixels // len(colors), 1)
+    return colors[np.minimum(_positions(num_pixels) // range_per_color, len(colors) - 1)]
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+""" Frames per second of the vectorized effects in effects.py versus the previous
+per-pixel implementations, computed into an in-memory strip (no hardware needed).
+
+    python3 effects_bench.py [seconds per case]
+"""
+
+from array import array
+import sys
+import time
+
+import effects
+
+
+PIXEL_COUNTS = (300, 1000, 5000)
+
+
+class MemoryStrip:
+    """ Stand-in for Adafruit_NeoPixel holding the LED data in a Python array. """
+    def __init__(self, num):
+        self.leds = array('I', [0]) * num
+
+    def numPixels(self):
+        return len(self.leds)
+
+    def setPixelColor(self, n, color):
+        if n < len(self.leds):
+            self.leds[n] = color
+
+    def setPixels(self, buffer, start=0):
+        data = memoryview(buffer).cast('B').cast('I')
+        memoryview(self.leds)[start:start + len(data)] = data
+
+
+# The per-pixel versions, as they were in light.py:
+def Color(red, green, blue, white=0):
+    return (white << 24) | (red << 16) | (green << 8) | blue
+
+def wheel(pos):
+    if pos < 85:
+        return Color(pos * 3, 255 - pos * 3, 0)
+    elif pos < 170:
+        pos -= 85
+        return Color(255 - pos * 3, 0, pos * 3)
+    else:
+        pos -= 170
+        return Color(0, pos * 3, 255 - pos * 3)
+
+def per_pixel_rainbow(strip, j):
+    for i in range(strip.numPixels()):
+        strip.setPixelColor(i, wheel((i+j) & 255))
+
+def per_pixel_rainbow_cycle(strip, j):
+    for i in range(strip.numPixels()):
+        strip.setPixelColor(i, wheel((int(i * 256 / strip.numPixels()) + j) & 255))
+
+def per_pixel_theater_chase_rainbow(strip, j):
+    q = j % 3
+    for i in range(0, strip.numPixels(), 3):
+        strip.setPixelColor(i+q, wheel((i+j) % 255))
+    for i in range(0, strip.numPixels(), 3):
+        strip.setPixelColor(i+q, 0)
+
+def per_pixel_fade(strip, j):
+    for i in range(strip.numPixels()):
+        strip.setPixelColor(i, j)
+
+
+CASES = (
+    ('rainbow', per_pixel_rainbow,
+        lambda strip, j: strip.setPixels(effects.rainbow(strip.numPixels(), j))),
+    ('rainbowCycle', per_pixel_rainbow_cycle,
+        lambda strip, j: strip.setPixels(effects.rainbow_cycle(strip.numPixels(), j))),
+    ('theaterChaseRainbow', per_pixel_theater_chase_rainbow,
+        lambda strip, j: strip.setPixels(effects.theater_chase_rainbow(strip.numPixels(), j, j % 3))),
+    ('fade', per_pixel_fade,
+        lambda strip, j: strip.setPixels(effects.fill(strip.numPixels(), j))),
+)
+
+
+def frames_per_second(draw, strip, seconds):
+    frames = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < seconds:
+        draw(strip, frames & 255)
+        frames += 1
+        elapsed = time.perf_counter() - started
+    return frames / elapsed
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+
+    print('{:<20} {:>7} {:>12} {:>12} {:>8}'.format('effect', 'pixels', 'per-pixel', 'vectorized', 'speedup'))
+    for name, per_pixel, vectorized in CASES:
+        for count in PIXEL_COUNTS:
+            strip = MemoryStrip(count)
+            before = frames_per_second(per_pixel, strip, seconds)
+            after = frames_per_second(vectorized, strip, seconds)
+            print('{:<20} {:>7} {:>12.1f} {:>12.1f} {:>7.1f}x'.format(name, count, before, after, after / before))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,62 +2,104 @@
 """ Implementation of my GRPC message.Executor server. """
 
 from concurrent import futures
+import logging
 
 import grpc
-from google.protobuf.json_format import MessageToJson, MessageToDict
 
 import message_pb2
 import message_pb2_grpc
-from .light import message_handler
-from .message import SceneMessage, AdministrativeMessage
+from .light import message_handler, make_command, submit_batch, get_status, open_stream
+from .message import decode
 
 
 
-LOGGER_NAME = 'log/gRPC_Server.log'
-LOG_LOCATION = 'server_logger'
+LOGGER_NAME = 'server_logger'
+LOG_LOCATION = 'log/gRPC_Server.log'
 
-ID = 'Id'
-FUNCTION_CALL = 'functionCall'
-VALUE = 'value'
+logger = logging.getLogger(LOGGER_NAME)
 
 
-class Executor(message_pb2_grpc.ExecutorServicer):
-    def configure_logger() -> logging.Logger:
-        logger = logging.getLogger(LOGGER_NAME)
+def configure_logger() -> logging.Logger:
+    # Called by serve(); the handler is only added once, however often it's called:
+    if not logger.handlers:
         handler = logging.FileHandler(LOG_LOCATION)
 
         logger.addHandler(handler)
         logger.setLevel(logging.DEBUG)
 
-        return logger
+    return logger
+
 
-    def ApplyChange(request, context):
+class Executor(message_pb2_grpc.ExecutorServicer):
+    def ApplyChange(self, request, context):
         # Hit the message_handler function:
         #   (also move paint_static_colors into animation_handler and get rid of animated bool)        
-        logger = configure_logger()
         logger.debug('in ApplyChange(); request: {}'.format(request))
-        # Use Google's protobuf -> Dict deserializer: 
-        message = MessageToDict(request)
-        # Then convert the Dict to a Python Object as one of the two types I've defined in message.py:
-        message_object = ConstructMessage(message)
-        logger.debug('message object constructed from Dict: {}'.format(message_object))
-        # Take the object & pass it to the message_handler in light.py:
-        message_handler(message_object)
-        return message_pb2.ChangeReply(message='success')
-
-    
-    def ConstructMessage(message):
-        # SceneMessages have Ids; AdministrativeMessages do not. Cast appropriately via duck typing: 
-        if (message[ID]):
-            message_object = SceneMessage(message)
-        else:
-            message_object = AdministrativeMessage(message[FUNCTION_CALL], message[VALUE])
-        
-        return message_object
+        # Convert the request straight to one of the types defined in message.py, parsing and
+        #   checking its colors once, here:
+        try:
+            # Take the object & pass it to the message_handler in light.py; it's only queued for the
+            #   render thread, so reply straight away with the number to look for in GetStatus:
+            sequence = message_handler(decode(request))
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        return message_pb2.ChangeReply(message='success', sequence=sequence)
+
+    def ApplyChanges(self, request, context):
+        return self.QueueChanges(request)
+
+    def GetStatus(self, request, context):
+        return message_pb2.StatusReply(**get_status())
+
+    def StreamFrames(self, request_iterator, context):
+        # Frames are decoded here, on the worker thread, and picked up by the render thread:
+        stream = open_stream()
+        try:
+            for frame in request_iterator:
+                stream.push(frame.pixels, frame.gzipped, frame.indices)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        finally:
+            stream.close()
+        return message_pb2.StreamSummary(**stream.stats())
+
+    def Control(self, request_iterator, context):
+        # One worker thread for the whole session, however many changes it sends:
+        for request in request_iterator:
+            yield self.QueueChange(request)
+
+    @staticmethod
+    def QueueChange(request):
+        # Queue a change from a control session, acknowledging it along with how the render
+        #   thread is keeping up; a bad change is reported without ending the session:
+        try:
+            sequence = message_handler(decode(request))
+            error = ''
+        except ValueError as e:
+            sequence, error = 0, str(e)
+        return message_pb2.ControlAck(sequence=sequence, error=error,
+                                      status=message_pb2.StatusReply(**get_status()))
+
+    @staticmethod
+    def QueueChanges(request):
+        # Decode the whole batch first; it's only queued if every change in it is good:
+        batch = []
+        errors = []
+        for change in request.changes:
+            try:
+                batch.append(make_command(decode(change)))
+                errors.append('')
+            except ValueError as e:
+                errors.append(str(e))
+
+        sequence = submit_batch(batch) if batch and not any(errors) else 0
+        return message_pb2.ChangeBatchReply(sequence=sequence,
+                                            results=[message_pb2.ChangeResult(error=error) for error in errors])
 
 
 
 def serve():
+    configure_logger()
     server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
     message_pb2_grpc.add_ExecutorServicer_to_server(Executor(), server)
     server.add_insecure_port('[::]:50051')
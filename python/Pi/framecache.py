@@ -0,0 +1,163 @@
+""" On-disk cache of compiled periodic scenes.
+
+One full period of a scene is rendered once into a binary file: a header followed by
+the frames, each led_count native-endian uint32 colors.  Later runs (and restarts)
+map the file with mmap and hand each frame to Adafruit_NeoPixel.setPixels() as-is,
+so playing a cached scene costs a single bulk copy per frame.
+
+The directory is kept under a total size by removing the least recently used scenes
+(by file modification time, which get() updates) whenever one is compiled.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+
+import numpy as np
+
+
+MAGIC = b'LCFC'
+VERSION = 1
+# magic, version, LED count, frames per second, frames per period:
+HEADER = struct.Struct('<4sIIdI')
+
+logger = logging.getLogger('light_logger')
+
+
+class CompiledScene:
+    """ A read-only, memory-mapped period of frames; frame(i) wraps around the period. """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.led_count, self.fps, self.period = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError('{} is not a compiled scene'.format(path))
+
+        self.frame_bytes = self.led_count * 4
+        if len(self._map) != HEADER.size + self.period * self.frame_bytes:
+            self._map.close()
+            raise ValueError('{} is truncated'.format(path))
+
+        self._frames = memoryview(self._map)[HEADER.size:]
+
+    def frame(self, index):
+        offset = (index % self.period) * self.frame_bytes
+        return self._frames[offset:offset + self.frame_bytes]
+
+    def frame_at(self, t):
+        """ The frame to show t seconds into the scene. """
+        return self.frame(int(t * self.fps))
+
+    def __len__(self):
+        return self.period
+
+    def close(self):
+        self._frames.release()
+        self._map.close()
+
+
+class FrameCache:
+    """ Directory of compiled scenes, keyed by anything with a stable repr (e.g. a tuple of the
+    scene name, its normalized colors and timing parameters), holding at most max_bytes of them.
+    Keys must include every parameter shaping the frames; a file whose LED count, frame rate or
+    period doesn't match the request is compiled again all the same.
+    """
+
+    def __init__(self, directory, max_bytes=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._open = {}
+        self.evicted = 0
+
+    def path_for(self, key, led_count):
+        digest = hashlib.sha1(repr((key, led_count)).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + '.frames')
+
+    def get(self, key, led_count, fps, period, render):
+        """ The compiled scene for key, compiling it first with render(i) -> frame i (an array of
+        led_count colors) for i in range(period) if it isn't on disk yet.
+        """
+        path = self.path_for(key, led_count)
+        if path in self._open:
+            self._touch(path)
+            return self._open[path]
+
+        try:
+            scene = CompiledScene(path)
+            if (scene.led_count, scene.fps, scene.period) != (led_count, fps, period):
+                scene.close()
+                raise ValueError('{} was compiled with other parameters'.format(path))
+            self._touch(path)
+        except (OSError, ValueError):
+            self.compile(path, led_count, fps, period, render)
+            scene = CompiledScene(path)
+            self.evict(keep=path)
+
+        self._open[path] = scene
+        return scene
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def evict(self, keep=None):
+        """ Remove the least recently used scenes until the directory holds at most max_bytes,
+        never removing the one at path keep.
+        """
+        if self.max_bytes is None:
+            return
+
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.frames'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+
+            scene = self._open.pop(path, None)
+            if scene is not None:
+                scene.close()
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evicted += 1
+            logger.info('Evicted compiled scene {} ({} bytes)'.format(path, size))
+
+    def compile(self, path, led_count, fps, period, render):
+        logger.info('Compiling {} frames of {} LEDs to {}'.format(period, led_count, path))
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Write to a temporary file and move it into place, so an interrupted compile
+        #   never leaves a partial scene behind:
+        temp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, led_count, fps, period))
+            for i in range(period):
+                frame = np.asarray(render(i), dtype=np.uint32)
+                if frame.shape != (led_count,):
+                    raise ValueError('Frame {} has {} colors, expected {}'.format(i, frame.size, led_count))
+                f.write(frame.tobytes())
+        os.replace(temp_path, path)
+
+    def close(self):
+        for scene in self._open.values():
+            scene.close()
+        self._open.clear()
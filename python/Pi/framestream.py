@@ -0,0 +1,87 @@
+""" Frames computed elsewhere and sent over the StreamFrames RPC.
+
+Frames are decoded as they arrive, on the thread receiving them, from little-endian uint32 colors
+on the wire into one buffer of native-endian uint32 colors; the render thread hands that buffer to Adafruit_NeoPixel.setPixels() once per frame
+at the scheduler's frame rate.  Only the latest frame is kept, so a sender running ahead of the
+frame rate has its extra frames replace each other instead of queueing up.
+"""
+
+import threading
+import zlib
+
+import numpy as np
+
+
+class FrameStream:
+    def __init__(self, num_pixels):
+        self.pixels = np.zeros(num_pixels, dtype=np.uint32)
+        self.closed = False
+        self.received = 0
+        self.shown = 0
+        self._lock = threading.Lock()
+        self._new_frame = False
+
+    def push(self, pixels, gzipped=False, indices=b''):
+        """ Decode a frame (see the Frame message): pixels are packed little-endian uint32 colors,
+        gzip-compressed if gzipped is set.  With indices (packed little-endian uint32) they are the
+        new colors of just those LEDs.  Raises ValueError for a frame which doesn't fit the strip.
+        """
+        if gzipped:
+            pixels = self._decompress(pixels)
+        if len(pixels) % 4 or len(indices) % 4:
+            raise ValueError('Frame pixels and indices must be packed uint32s')
+        colors = np.frombuffer(pixels, dtype='<u4')
+
+        if indices:
+            leds = np.frombuffer(indices, dtype='<u4')
+            if leds.size != colors.size:
+                raise ValueError('Frame has {} indices for {} colors'.format(leds.size, colors.size))
+            if leds.size and int(leds.max()) >= self.pixels.size:
+                raise ValueError('Frame index {} is past the last LED ({})'.format(int(leds.max()), self.pixels.size - 1))
+        elif colors.size > self.pixels.size:
+            raise ValueError('Frame has {} colors for {} LEDs'.format(colors.size, self.pixels.size))
+
+        with self._lock:
+            if indices:
+                self.pixels[leds] = colors
+            else:
+                self.pixels[:colors.size] = colors
+            self.received += 1
+            self._new_frame = True
+
+    def _decompress(self, data):
+        """ Gunzip a frame's pixels, refusing to inflate them past one color per LED. """
+        max_bytes = 4 * self.pixels.size
+        decompressor = zlib.decompressobj(wbits=31)
+        try:
+            pixels = decompressor.decompress(data, max_bytes + 1)
+        except zlib.error as e:
+            raise ValueError('Frame is not valid gzip: {}'.format(e))
+
+        if len(pixels) > max_bytes or decompressor.unconsumed_tail:
+            raise ValueError('Frame decompresses to more than {} bytes'.format(max_bytes))
+        if not decompressor.eof:
+            raise ValueError('Frame is truncated gzip')
+        if decompressor.unused_data:
+            raise ValueError('Frame has data after its gzip stream')
+        return pixels
+
+    def show_latest(self, strip):
+        """ Copy the latest frame into the strip's buffer, if one arrived since the last call;
+        called by the render thread.  Returns whether there was one.
+        """
+        with self._lock:
+            if not self._new_frame:
+                return False
+            strip.setPixels(self.pixels)
+            self._new_frame = False
+            self.shown += 1
+            return True
+
+    def close(self):
+        """ The sender is done; the last frame stays on the strip. """
+        self.closed = True
+
+    def stats(self):
+        with self._lock:
+            return {'framesReceived': self.received, 'framesShown': self.shown}
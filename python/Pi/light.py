@@ -4,10 +4,18 @@
 # various animations on a strip of NeoPixels.
 from neopixel import *
 from .message import SceneMessage, AdministrativeMessage
+from .commands import SceneCommand, StreamCommand, BrightnessCommand, OffCommand, CommandMailbox, coalesce
+from .scheduler import FrameScheduler
+from . import effects
+from .colors import parse_hex, to_rgb, palette, wheel
+from .cache import LRUCache
+from .framecache import FrameCache
+from .framestream import FrameStream
 
 import animations
 import argparse
 import logging
+import queue
 import threading
 import time
 import sys
@@ -29,6 +37,30 @@ LED_DMA        = 10      # DMA channel to use for generating signal (try 10)
 LED_BRIGHTNESS = 255     # Set to 0 for darkest and 255 for brightest
 LED_INVERT     = False   # True to invert the signal (when using NPN transistor level shift)
 LED_CHANNEL    = 0       # set to '1' for GPIOs 13, 19, 41, 45 or 53
+LED_GAMMA      = 'linear' # Gamma correction, one of neopixel.GAMMA_PRESETS ('neopixel' matches Adafruit's gamma8)
+TARGET_FPS     = 60      # Frame rate for animations; capped at what the wire protocol allows for LED_COUNT
+
+# Frame rates for animations which shouldn't run at TARGET_FPS:
+ANIMATION_FPS = {
+    "Breathe": 100,
+    "Fade": 15,
+    "Rainbow": 50,
+    "TheaterChase": 20,
+}
+# Compute frames from the elapsed time where an animation supports it, dropping
+#   frames instead of slowing down when rendering can't keep up:
+TIME_BASED_ANIMATIONS = True
+
+# Bounds for the cache of parsed colors and fade tables, kept across scene changes:
+SCENE_CACHE_ENTRIES = 64
+SCENE_CACHE_BYTES   = 4 * 1024 * 1024
+# Periodic scenes are compiled here once, then replayed from disk:
+FRAME_CACHE_DIR = 'cache/frames'
+# Least recently used compiled scenes are removed beyond this total size:
+FRAME_CACHE_BYTES = 64 * 1024 * 1024
+# Encode compiled scenes for the driver once, then send the encoded frames as-is, if they
+#   take up to this many bytes (0 to disable); each is a full DMA buffer, growing with LED_COUNT:
+PRE_ENCODE_MAX_BYTES = 16 * 1024 * 1024
 
 DARK_PIXEL = Color(0,0,0)
 
@@ -38,86 +70,132 @@ LOG_LOCATION = 'log/light.log'
 
 UPDATE_BRIGHTNESS = 'update_brightness'
 OFF = 'off'
+# Reported as the scene id while showing streamed frames:
+STREAM = 'stream'
+
+# Commands for the render thread, which owns the strip (see render_loop):
+strip = None
+commands = CommandMailbox()
+render_thread = None
+render_thread_lock = threading.Lock()
+# When set, called with each submitted command instead of starting the render thread, for
+#   a render loop running on an event loop (see aio_server):
+on_submit = None
+# Command taken off the queue between frames, which ended the running animation:
+pending_command = None
+# Set once the render thread has been asked to stop between frames (see apply_pending_commands):
+shutting_down = False
+frame_scheduler = None
+
+# Reported by get_status():
+applied_sequence = 0
+displayed_scene_id = ''
+# Content hash of the scene being displayed (see message.content_hash), None for anything but a
+#   scene, or while it's being replaced:
+displayed_scene_hash = None
+
+# Set to end the running animation; effects wait on it rather than sleeping, so
+#   a scene change never waits out a sleep:
+stop_event = threading.Event()
+# When the latest scene command arrived, until its first frame has been shown:
+command_received_at = None
 
 
 def fastWipe(color=DARK_PIXEL):
     global strip
 
-    """Wipe color REAL QUICK across display a pixel at a time."""
-    for i in range(strip.numPixels()):
-        strip.setPixelColor(i, color)
-
+    """Wipe color REAL QUICK across the whole display in one bulk write."""
+    strip.setPixels(effects.fill(strip.numPixels(), color))
     strip.show()
 
 
 # Define functions which animate LEDs in various ways.
-def colorWipe(color, wait_ms=50):
-    """Wipe color across display a pixel at a time."""
+# Animations are generators which set the pixels of one frame per step; a
+#   FrameScheduler shows each frame and paces them.
+def colorWipe(color):
+    """Wipe color across display a pixel at a time (20 fps originally)."""
     global strip
 
     for i in range(strip.numPixels()):
         strip.setPixelColor(i, color)
-        strip.show()
-        time.sleep(wait_ms/1000.0)
+        yield
 
-def theaterChase(color, wait_ms=50, iterations=10):
-    """Movie theater light style chaser animation."""
+def theaterChase(color, iterations=10):
+    """Movie theater light style chaser animation (20 fps originally)."""
     global strip
 
     for j in range(iterations):
         for q in range(3):
-            for i in range(0, strip.numPixels(), 3):
-                strip.setPixelColor(i+q, color)
-            strip.show()
-            time.sleep(wait_ms/1000.0)
-            for i in range(0, strip.numPixels(), 3):
-                strip.setPixelColor(i+q, 0)
-
-def wheel(pos):
-    """Generate rainbow colors across 0-255 positions."""
-    global strip
+            strip.setPixels(effects.theater_chase(strip.numPixels(), color, q))
+            yield
 
-    if pos < 85:
-        return Color(pos * 3, 255 - pos * 3, 0)
-    elif pos < 170:
-        pos -= 85
-        return Color(255 - pos * 3, 0, pos * 3)
-    else:
-        pos -= 170
-        return Color(0, pos * 3, 255 - pos * 3)
-
-def rainbow(wait_ms=20, iterations=1):
-    """Draw rainbow that fades across all pixels at once."""
+def rainbow(iterations=1):
+    """Draw rainbow that fades across all pixels at once (50 fps originally)."""
     global strip
 
     for j in range(256*iterations):
-        for i in range(strip.numPixels()):
-            strip.setPixelColor(i, wheel((i+j) & 255))
-        strip.show()
-        time.sleep(wait_ms/1000.0)
+        strip.setPixels(effects.rainbow(strip.numPixels(), j))
+        yield
 
-def rainbowCycle(wait_ms=20, iterations=5):
-    """Draw rainbow that uniformly distributes itself across all pixels."""
+def rainbowCycle(iterations=5):
+    """Draw rainbow that uniformly distributes itself across all pixels (50 fps originally)."""
     global strip
 
     for j in range(256*iterations):
-        for i in range(strip.numPixels()):
-            strip.setPixelColor(i, wheel((int(i * 256 / strip.numPixels()) + j) & 255))
-        strip.show()
-        time.sleep(wait_ms/1000.0)
+        strip.setPixels(effects.rainbow_cycle(strip.numPixels(), j))
+        yield
 
-def theaterChaseRainbow(wait_ms=50):
-    """Rainbow movie theater light style chaser animation."""
+def theaterChaseRainbow():
+    """Rainbow movie theater light style chaser animation (20 fps originally)."""
     global strip
 
     for j in range(256):
         for q in range(3):
-            for i in range(0, strip.numPixels(), 3):
-                strip.setPixelColor(i+q, wheel((i+j) % 255))
-            strip.show()
-            time.sleep(wait_ms/1000.0)
-            for i in range(0, strip.numPixels(), 3):
-                strip.setPixelColor(i+q, 0)
+            strip.setPixels(effects.theater_chase_rainbow(strip.numPixels(), j, q))
+            yield
+
+# The above as scenes, which are sent colors (ignored by the rainbows):
+def rainbow_scene(colors):
+    yield from rainbow()
+
+def theater_chase_scene(colors):
+    """Theater chase of the first color."""
+    red, green, blue = convert_to_rgb(colors)[0]
+    yield from theaterChase(Color(green, red, blue))
+
+# Time-based versions; each returns a function drawing the frame for t seconds
+#   into the animation:
+def timed_rainbow(colors=None, cycle_s=256/50):
+    """Rainbow fading across all pixels at once, one full cycle per cycle_s seconds."""
+    global strip
+
+    num_pixels = strip.numPixels()
+    fps = 256 / cycle_s
+    scene = frame_cache.get(('Rainbow', cycle_s, fps), num_pixels, fps, 256,
+                            lambda j: effects.rainbow(num_pixels, j))
+
+    return replay(scene)
+
+def timed_theaterChase(colors, step_s=0.05):
+    """Movie theater chase of the first color, moving one pixel every step_s seconds."""
+    global strip
+
+    red, green, blue = convert_to_rgb(colors)[0]
+    color = Color(green, red, blue)
+
+    def render(t):
+        strip.setPixels(effects.theater_chase(strip.numPixels(), color, int(t / step_s) % 3))
+    return render
+
+def timed_gradient(colors, cycle_s=10):
+    """Gradient through the colors spread across the strip, rotating once every cycle_s seconds."""
+    global strip
+
+    table = palette(colors, grb=True)
+
+    def render(t):
+        strip.setPixels(effects.palette_cycle(strip.numPixels(), table, int(t * 256 / cycle_s)))
+    return render
 
 # Personal Additions: #
 
@@ -129,13 +207,18 @@ class Delta:
         self.increase = increase
 
 
-def convert_to_rgb(colors: list):
-    tupleys = []
-    for hex_color in colors:
-        hex_color = hex_color.lstrip('#')
-        tupleys.append(tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4)))
+scene_cache = LRUCache(SCENE_CACHE_ENTRIES, SCENE_CACHE_BYTES)
+frame_cache = FrameCache(FRAME_CACHE_DIR, FRAME_CACHE_BYTES)
 
-    return tupleys
+
+def normalize_colors(colors) -> tuple:
+    """ Colors (hex strings or packed 0xrrggbb, see message.decode) as a hashable cache key of packed ints. """
+    return tuple(parse_hex(color) if isinstance(color, str) else color for color in colors)
+
+
+def convert_to_rgb(colors: list):
+    key = normalize_colors(colors)
+    return scene_cache.get(('rgb', key), lambda: tuple(to_rgb(color) for color in key))
 
 # Action functions:
 # Administrative:
@@ -153,102 +236,301 @@ def make_strip(brightness):
     global strip
 
     strip = Adafruit_NeoPixel(LED_COUNT, LED_PIN, LED_FREQ_HZ, LED_DMA, LED_INVERT, int(brightness), LED_CHANNEL)
+    strip.setGamma(LED_GAMMA)
     return strip
 
 
 def message_handler(message):
-    global scene
-    global strip
-    global prev_message
-
-    try:
-        # First check if the message requires termination of the previous scene:
-        if handle_ending_animation(message):
-            return
-        # Ensure that the strip has been initialized; if so, apply the new brightness,
-        #   otherwise, create the strip first:
-        if strip is not None:
-            if type(message) == SceneMessage:
-                strip.setBrightness(int(message.defaultBrightness))
-    except (UnboundLocalError, NameError) as e:
-        # These errors will occur when the strip has not been initialized;
-        #   i.e. the first time a scene is applied.
-        strip = make_strip(message.defaultBrightness)
-        strip.begin()
+    """Queue a message for the render thread; called from the gRPC worker threads.  Returns the
+    sequence number of the queued command, see get_status()."""
+    return submit(make_command(message))
+
+
+def submit_batch(batch):
+    """Queue commands to take effect together, at one frame boundary: they're folded into a single
+    command (see commands.coalesce), so there's no frame with only some of them applied.  Returns
+    its sequence number."""
+    return submit(coalesce(batch))
+
+
+def make_command(message):
+    """The command for a message; raises ValueError if it's malformed, so bad messages are
+    turned away on arrival rather than failing on the render thread."""
+    functionCall = getattr(message, 'functionCall', None)
+
+    if functionCall == OFF:
+        return OffCommand()
+    elif functionCall == UPDATE_BRIGHTNESS:
+        return BrightnessCommand(int(message.value))
+
+    animation = getattr(message, 'animation', None)
+    if getattr(message, 'animated', False) and animation not in ANIMATIONS and not (
+            TIME_BASED_ANIMATIONS and animation in TIMED_ANIMATIONS):
+        raise ValueError('Unknown animation {!r}'.format(animation))
+    return SceneCommand(message)
+
+
+def open_stream():
+    """Start showing frames sent by a StreamFrames call, in place of the current scene; called from
+    the gRPC worker threads.  The caller pushes frames into the returned FrameStream and closes it
+    once the call ends."""
+    stream = FrameStream(LED_COUNT)
+    submit(StreamCommand(stream))
+    return stream
+
+
+def get_status():
+    """What is being displayed, as reported by the GetStatus RPC."""
+    scheduler = frame_scheduler
+    status = {
+        'sceneId': displayed_scene_id,
+        'brightness': strip.getBrightness() if strip is not None else 0,
+        'appliedSequence': applied_sequence,
+        'sceneHash': displayed_scene_hash or '',
+        'queueDepth': commands.depth(),
+    }
+    if scheduler is not None:
+        status.update({
+            'fps': scheduler.achieved_fps(),
+            'frameTimeMs': scheduler.frame_work_time * 1000,
+            'maxFrameTimeMs': scheduler.max_frame_work_time * 1000,
+            'lateFrames': scheduler.late_frames,
+        })
+    return status
+
+
+def submit(command):
+    """Hand a command to the render thread, starting it on first use.  Anything but a brightness
+    change (or a scene looking just like the displayed one) ends the running animation right away
+    instead of after its current frame."""
+    global render_thread
+    global displayed_scene_hash
+
+    if on_submit is None:
+        with render_thread_lock:
+            if render_thread is None:
+                render_thread = threading.Thread(target=render_loop, name='render', daemon=True)
+                render_thread.start()
+
+    # Set as it's queued, so it can't end the animation started for this very command.  A scene
+    #   looking just like the one displayed doesn't interrupt it:
+    interrupt = None
+    if not isinstance(command, BrightnessCommand) and not is_displayed(command):
+        displayed_scene_hash = None
+        interrupt = stop_event
+    sequence = commands.put(command, interrupt)
+
+    if on_submit is not None:
+        on_submit(command)
+    return sequence
+
+
+def is_displayed(command):
+    """Whether command is a scene looking just like the one displayed (whatever its Id), so
+    applying it changes nothing."""
+    return (isinstance(command, SceneCommand) and command.content_hash is not None
+            and command.content_hash == displayed_scene_hash)
+
+
+def stop_rendering(clear=False):
+    """Stop the render thread, turning the lights off first if clear is set."""
+    if clear:
+        submit(OffCommand())
+    submit(None)
+    if render_thread is not None:
+        render_thread.join()
+
+
+def render_loop():
+    """The render thread: the only thread touching the strip.  Applies commands from the mailbox,
+    where a burst of them is coalesced down to the newest; animations check for new ones between frames."""
+    global pending_command
+    global shutting_down
+
+    shutting_down = False
+    command = commands.get()
+    while command is not None:
+        # Left set if a newer command arrived since this one was taken, ending its animation at once:
+        commands.clear_interrupt(stop_event, command.sequence)
+        pending_command = None
+        try:
+            apply_command(command)
+        except Exception:
+            logger.exception('Failed to apply {}'.format(type(command).__name__))
+        mark_applied(command)
 
-    
-    try:
-        if message.animated:
-            scene = threading.Thread(target=animation_handler, args=(message.colors, message.animation))
-    except KeyError as ke:
-        # Serialization & deserialization into proto Objects and back will remove
-        logger.debug('KeyError: {}'.format(ke))
-        scene = threading.Thread(target=paint_with_colors, args=(colors))
+        if shutting_down:
+            break
+        # A command which ended an animation comes first, as it was taken off the queue already:
+        command = pending_command if pending_command is not None else commands.get()
 
-    scene.start()
-    
-    prev_message = message
 
+def mark_applied(command):
+    """Record that command, and with it any older command it superseded, has been applied."""
+    global applied_sequence
 
-def animation_handler(colors, animation):
-    global stop_animation
+    applied_sequence = max(applied_sequence, command.sequence)
 
-    logger.info('Received animation {} in animation_handler'.format(animation))
 
-    while not stop_animation:
-        switcher = {
-            "Projectile": fire_projectiles,
-            "Breathe": breathe,
-            "Twinkle": twinkle,
-            "Fade": fade_between,
-            "Meiosis": meiosis
-        }
-        switcher[animation](colors)
+def apply_command(command):
+    animation = start_command(command)
+    if animation is not None:
+        animation_handler(*animation)
 
 
-def handle_ending_animation(message):
-    # import pdb; pdb.set_trace()
-    global stop_animation
+def start_command(command):
+    """Apply a command, short of running an animation: returns (colors, animation) for the caller
+    to run if the command is an animated scene, else None."""
     global strip
+    global command_received_at
+    global frame_scheduler
+    global displayed_scene_id
+    global displayed_scene_hash
+
+    if isinstance(command, BrightnessCommand):
+        logger.info("UPDATING BRIGHTNESS TO: {}".format(command.brightness))
+        if strip is not None:
+            strip.setBrightness(command.brightness)
+            strip.show()
+        # The scene no longer looks as sent (its defaultBrightness is part of the hash), so
+        #   sending it again has to restore its brightness:
+        displayed_scene_hash = None
+        return
+
+    # Don't bother with re-applying the same scene, though it may come with a new Id:
+    if is_displayed(command):
+        displayed_scene_id = getattr(command.message, 'Id', '')
+        return
 
-    # Short-circuit in the event of a "turn off" message:
-    if message.functionCall == OFF:
+    command_received_at = command.received_at
+    frame_scheduler = None
+
+    if isinstance(command, OffCommand):
+        logger.info('Hit \'off\' fucntionCall')
         if strip is not None:
-            logger.info('Hit \'off\' fucntionCall')
-            stop_animation = True
-            scene.join()
             fastWipe()
+            log_switch_latency()
             logger.info('Lights wiped; they should now be in their \"off\" state.')
-            stop_animation = False
-            # Returning False tells the main loop to just wait for the next message
-            #   instead of handling it further as if it were a scene
-            return True
-
-    elif message.functionCall == UPDATE_BRIGHTNESS :
-        logger.info("UPDATING BRIGHTNESS TO: {}".format(message.value))
-        strip.setBrightness(int(message.value))
-        strip.show()
-        return True
-
+        # The same scene can be turned back on again:
+        displayed_scene_hash = None
+        displayed_scene_id = ''
+        return
+
+    if isinstance(command, StreamCommand):
+        logger.info('Showing streamed frames')
+        if strip is None:
+            strip = make_strip(LED_BRIGHTNESS)
+            strip.begin()
+        displayed_scene_hash = None
+        displayed_scene_id = STREAM
+        mark_applied(command)
+        return command.stream, STREAM
+
+    message = command.message
+    # A brightness change batched with the scene (see submit_batch) takes its place:
+    brightness = command.brightness if command.brightness is not None else message.defaultBrightness
+    displayed_scene_hash = command.content_hash
+    displayed_scene_id = getattr(message, 'Id', '')
+
+    if strip is None:
+        strip = make_strip(brightness)
+        strip.begin()
     else:
+        strip.setBrightness(int(brightness))
+
+    # Animations only return once they're ended, so report the scene as applied now:
+    mark_applied(command)
+
+    # Serialization into dicts drops fields left at their defaults, such as animated=False:
+    if getattr(message, 'animated', False):
+        return message.colors, message.animation
+    paint_with_colors(message.colors)
+
+
+def apply_pending_commands():
+    """Called by the render thread between frames: applies brightness changes, and ends the
+    animation for anything else, leaving the command in pending_command.  Being asked to stop
+    ends the animation and sets shutting_down."""
+    global pending_command
+    global displayed_scene_hash
+    global shutting_down
+
+    while pending_command is None and not shutting_down:
         try:
-            # Check if the changed-to scene is the same as the last - if not, tell the thread to end.
-            if prev_message.Id == message.Id:
-                # Don't bother with re-applying the same scene:
-                return True
+            command = commands.get_nowait()
+        except queue.Empty:
+            return
 
+        if command is None:
+            # See stop_rendering(); render_loop exits once the animation has ended:
+            shutting_down = True
+            stop_event.set()
+        elif isinstance(command, BrightnessCommand):
+            logger.info("UPDATING BRIGHTNESS TO: {}".format(command.brightness))
+            strip.setBrightness(command.brightness)
+            # As in start_command:
+            displayed_scene_hash = None
+            mark_applied(command)
+        elif is_displayed(command):
+            # The running animation already shows it:
+            start_command(command)
+            mark_applied(command)
+        else:
+            pending_command = command
+            stop_event.set()
+
+
+def log_switch_latency():
+    """Log the time from the latest scene command arriving to its first frame being shown,
+    once per command; warns when it took longer than a frame at TARGET_FPS."""
+    global command_received_at
+
+    if command_received_at is None:
+        return
+    latency = time.monotonic() - command_received_at
+    command_received_at = None
+
+    if latency > 1.0 / TARGET_FPS:
+        logger.warning('Scene switch took {:.1f} ms, more than one frame period'.format(latency * 1000))
+    else:
+        logger.info('Scene switch took {:.1f} ms'.format(latency * 1000))
+
+
+def animation_handler(colors, animation):
+    global frame_scheduler
+
+    logger.info('Received animation {} in animation_handler'.format(animation))
+
+    frame_scheduler = make_frame_scheduler(animation, between_frames=apply_pending_commands)
+
+    if TIME_BASED_ANIMATIONS and animation in TIMED_ANIMATIONS:
+        frame_scheduler.run_timed(TIMED_ANIMATIONS[animation](colors))
+    else:
+        while not stop_event.is_set():
+            frames = ANIMATIONS[animation](colors)
+            # Meiosis still paces itself:
+            if frames is not None:
+                frame_scheduler.run(frames)
             else:
-                if prev_message.animated:
-                    # Tell animated function to end, then wait for it to do so before continuing.
-                    stop_animation = True
-                    scene.join()
-                    stop_animation = False
-                return False
-
-        # If animationId is unset (first animation since app start), initialize stop_animation to False:
-        except (NameError, KeyError):
-            stop_animation = False
-            return False
+                apply_pending_commands()
+
+    log_animation_stats(animation, frame_scheduler)
+
+
+def make_frame_scheduler(animation, between_frames=None):
+    return FrameScheduler(strip, ANIMATION_FPS.get(animation, TARGET_FPS),
+                          stop_event=stop_event, freq_hz=LED_FREQ_HZ,
+                          on_first_frame=log_switch_latency,
+                          between_frames=between_frames)
+
+
+def log_animation_stats(animation, scheduler):
+    logger.info('Animation {} ended: {}'.format(animation, scheduler.stats()))
+    # Renders of unchanged frames are skipped (see Adafruit_NeoPixel.show()); counted since start:
+    logger.info('Renders: {}'.format(strip.getRenderStats()))
+    logger.info('Scene cache: {}'.format(scene_cache.stats()))
+    logger.info('Commands: {}'.format(commands.stats()))
+
 
 ############
 # Scenes: #
@@ -259,7 +541,7 @@ def paint_with_colors(*colors):
     # Accept color as hex
     logger.info('Setting solid color to: {}'.format(colors))
 
-    if type(colors[0]) == str:
+    if type(colors[0]) in (str, int):
         # Extracting ints from RgbColor object, which stores them as strings:
         rgb_tuples = convert_to_rgb(colors)
     elif type(colors[0]) == list:
@@ -267,57 +549,61 @@ def paint_with_colors(*colors):
     else:
         rgb_tuples = colors
 
-    range_per_color = strip.numPixels() / len(rgb_tuples)
-    range_per_color = int(range_per_color)
-    rgb_tuple_index = 0
-
     logger.info('rgb_tuples: {}, len(rgb_tuples): {}, type(rgb_tuples[0]): {}'.format(rgb_tuples, len(rgb_tuples), type(rgb_tuples[0])))
 
-    for i in range(strip.numPixels()):
-        # Make the strip show even(ish) amounts of each color, with remainder applied to last color
-        if i % range_per_color == 0 and rgb_tuple_index < len(rgb_tuples):
-            red, green, blue = rgb_tuples[rgb_tuple_index]
-            rgb_tuple_index += 1
-            # No idea why, but this function accepts in format GRB..
-        strip.setPixelColor(i, Color(green, red, blue))
-        strip.show()
+    # Make the strip show even(ish) amounts of each color, with remainder applied to last color
+    # No idea why, but this function accepts in format GRB..
+    grb_colors = [Color(green, red, blue) for red, green, blue in rgb_tuples]
+    strip.setPixels(effects.segments(strip.numPixels(), grb_colors))
+    strip.show()
+    log_switch_latency()
 
 
 def fire_projectiles(colors, projectile_size=8):
     global strip
-    global stop_animation
     rgb_tuples = convert_to_rgb(colors)
 
-    while not stop_animation:
+    while not stop_event.is_set():
         for tuple in rgb_tuples:
-            if stop_animation:
+            if stop_event.is_set():
                 break
             red, green, blue = tuple
             for i in range(strip.numPixels()):
                 strip.setPixelColor(i, Color(green, red, blue))
-                strip.show()
+                yield
                 # i => head of projectile
                 if i > (projectile_size - 1):
                     strip.setPixelColor(i - projectile_size, Color(0,0,0))
 
 
 def breathe(colors):
-    global stop_animation
     global strip
 
     paint_with_colors(colors)
 
-    while not stop_animation:
+    while not stop_event.is_set():
         # Increase brightness from 155 -> 255 (breathe upswing)
         for i in range(1, 128):
             strip.setBrightness(int(i))
-            strip.show()
-            time.sleep(1/1000)
+            yield
         # Decrease brightness from 254 -> 156 (breathe downswing)
         for i in range(1, 127):
             strip.setBrightness(int(128-i))
-            strip.show()
-            time.sleep(1/1000)
+            yield
+
+
+def timed_breathe(colors, period_s=2.53):
+    """Breathe with one full up and down swing of brightness every period_s seconds."""
+    global strip
+
+    paint_with_colors(colors)
+
+    def render(t):
+        # Triangle wave between brightness 1 and 127:
+        phase = (t % period_s) / period_s
+        swing = phase * 2 if phase < .5 else (1 - phase) * 2
+        strip.setBrightness(int(1 + swing * 126))
+    return render
 
 
 def twinkle(colors, pct_lit=.3):
@@ -337,9 +623,9 @@ def twinkle(colors, pct_lit=.3):
     for pixel, color in indices_and_tupleys.items():
         red, green, blue = color
         strip.setPixelColor(pixel, Color(green, red, blue))
-        strip.show()
+    yield
 
-    while not stop_animation:
+    while not stop_event.is_set():
         for _ in indices_and_tupleys.keys():
             off_index_of_dict = randint(0, len(indices_and_tupleys.keys()) - 1)
             off_index = list(indices_and_tupleys.keys())[off_index_of_dict]
@@ -348,11 +634,10 @@ def twinkle(colors, pct_lit=.3):
             red, green, blue = tupleys[on_color_index]
 
             strip.setPixelColor(off_index, Color(0, 0, 0))
-            strip.show()
             pixel_list.append(off_index)
 
             strip.setPixelColor(on_index, Color(green, red, blue))
-            strip.show()
+            yield
             pixel_list.pop(on_index)
 
 
@@ -368,8 +653,12 @@ def bridge_fade(old, new, delta, idx, numSteps, step):
 
 
 def calculate_intermediates(colors, seconds=10):
+    key = ('fade', normalize_colors(colors), seconds)
+    return scene_cache.get(key, lambda: build_intermediates(convert_to_rgb(colors), seconds))
+
+
+def build_intermediates(rgb_colors, seconds):
     intermediate_colors = []
-    rgb_colors = convert_to_rgb(colors)
     for i, color in enumerate(rgb_colors):
         # Wrap around to first item when on last index so it goes full-circle smoothly:
         next = (i + 1) % (len(rgb_colors))
@@ -389,23 +678,78 @@ def calculate_intermediates(colors, seconds=10):
             newB = bridge_fade(color, nextColor, diffB, 2, numSteps, currentStep)
             intermediate_colors.append(Color(newG, newR, newB))
 
-    return intermediate_colors
+    return tuple(intermediate_colors)
 
 
 def fade_between(colors):
     global strip
 
     # Figure a percent to change between colors, then populate an array with
-    #   each intermediate color for the length of the full cycle:
-    speed = 15
+    #   each intermediate color for the length of the full cycle; it's played
+    #   back at ANIMATION_FPS["Fade"] frames per second:
     intermediate_colors = calculate_intermediates(colors)
 
-    while not stop_animation:
+    while not stop_event.is_set():
         for color in intermediate_colors:
-            for i in range(strip.numPixels()):
-                strip.setPixelColor(i, color)
-            strip.show()
-            time.sleep(1/speed)
+            strip.setPixels(effects.fill(strip.numPixels(), color))
+            yield
+
+
+def timed_fade_between(colors, seconds=10):
+    """Fade through the colors, taking the given number of seconds between each pair."""
+    global strip
+
+    intermediate_colors = calculate_intermediates(colors, seconds)
+    # calculate_intermediates makes steps of .2 seconds:
+    steps_per_second = 5
+
+    num_pixels = strip.numPixels()
+    scene = frame_cache.get(('Fade', normalize_colors(colors), seconds, steps_per_second), num_pixels,
+                            steps_per_second, len(intermediate_colors),
+                            lambda i: effects.fill(num_pixels, intermediate_colors[i]))
+
+    return replay(scene)
+
+
+def replay(scene):
+    """Play back a compiled scene.  Ones whose encoded frames fit in PRE_ENCODE_MAX_BYTES are
+    encoded for the driver up front, and the encoded frames sent as long as the brightness they
+    were encoded with doesn't change; others are rendered frame by frame."""
+    global strip
+
+    brightness = strip.getBrightness()
+    encoded = []
+    if PRE_ENCODE_MAX_BYTES and len(scene):
+        strip.setPixels(scene.frame(0))
+        first = strip.captureFrame()
+        if len(first) * len(scene) <= PRE_ENCODE_MAX_BYTES:
+            encoded.append(first)
+            for i in range(1, len(scene)):
+                strip.setPixels(scene.frame(i))
+                encoded.append(strip.captureFrame())
+        else:
+            first.free()
+
+    def render(t):
+        if encoded and strip.getBrightness() == brightness:
+            return encoded[int(t * scene.fps) % len(encoded)]
+        strip.setPixels(scene.frame_at(t))
+    return render
+
+
+def stream_frames(stream):
+    """Show the latest frame pushed into the stream each frame, until the stream is closed."""
+    global strip
+
+    while not stream.closed:
+        # The strip skips re-sending a frame when no new one arrived:
+        stream.show_latest(strip)
+        yield
+    # Keep showing the last frame, without starting over:
+    stream.show_latest(strip)
+    yield
+    logger.info('Frame stream ended: {}'.format(stream.stats()))
+    stop_event.set()
 
 
 def recenter_cell(recenter_left, color, drift_factor):
@@ -424,7 +768,8 @@ def recenter_cell(recenter_left, color, drift_factor):
         right_pixel = right_pixel + drift_factor
         left_pixel = left_pixel + drift_factor
         strip.show()
-        time.sleep(1)
+        if stop_event.wait(1):
+            return
 
 
 def shift_cells(colors, starting_points, absolute_destination):
@@ -456,7 +801,8 @@ def shift_cells(colors, starting_points, absolute_destination):
         strip.setPixelColor(l_change, left_color)
         strip.setPixelColor(r_change, right_color)
         strip.show()
-        time.sleep(.75)
+        if stop_event.wait(.75):
+            return
 
 
 def drift_to_centerpoint(colors, starting_points, iteration):
@@ -513,7 +859,8 @@ def grow_cell(colors, starting_points):
     # Revise; this will send a negative number for the first phase
     for phase in range(1,telephase_radius,2):
         exec_growth_phase(colors, starting_points, phase)
-        time.sleep(1)
+        if stop_event.wait(1):
+            return
 
 
 def get_starting_points(colors, num_children):
@@ -537,7 +884,7 @@ def meiosis(colors):
     # Make 1 large ball of a color, then split it as it grows, changing color each time
     centerpoint = strip.numPixels() // 2
 
-    if type(colors[0]) == str:
+    if type(colors[0]) in (str, int):
         # Extracting ints from RgbColor object, which stores them as strings:
         rgb_tuples = convert_to_rgb(colors)
     else:
@@ -547,27 +894,52 @@ def meiosis(colors):
     red, green, blue = rgb_tuples[0]
 
 
-    while not stop_animation:
+    while not stop_event.is_set():
         strip.setPixelColor(centerpoint, Color(green, red, blue))
 
         for iteration in range(1, len(colors)):
             starting_points = get_starting_points(colors, iteration)
             grow_cell(rgb_tuples, starting_points)
+            if stop_event.is_set():
+                return
             drift_to_centerpoint(colors, starting_points)
+            if stop_event.is_set():
+                return
 
         fastWipe()
 
 
 
+# Animations by name; the timed versions are used instead where there is one, with TIME_BASED_ANIMATIONS.
+#   Those with no frame-based version (Gradient) are only accepted while it's on:
+ANIMATIONS = {
+    "Projectile": fire_projectiles,
+    "Breathe": breathe,
+    "Twinkle": twinkle,
+    "Fade": fade_between,
+    "Meiosis": meiosis,
+    "Rainbow": rainbow_scene,
+    "TheaterChase": theater_chase_scene,
+    STREAM: stream_frames
+}
+TIMED_ANIMATIONS = {
+    "Breathe": timed_breathe,
+    "Fade": timed_fade_between,
+    "Rainbow": timed_rainbow,
+    "Gradient": timed_gradient,
+    "TheaterChase": timed_theaterChase
+}
+
+
 def run():
     global logger
     global strip
-    global scene
-    global stop_animation
 
     # Process arguments:
     parser = argparse.ArgumentParser()
     parser.add_argument('-c', '--clear', action='store_true', help='clear the display on exit')
+    parser.add_argument('-a', '--asyncio', action='store_true',
+                        help='serve with grpc.aio, rendering on the same event loop (fewer threads)')
     args = parser.parse_args()
 
     # Create the logger:
@@ -582,11 +954,16 @@ def run():
 
     try:
         # Serve up the gRPC server & wait for messages to arrive:
-        import Pi.executor_server as server
-        server.serve()
+        if args.asyncio:
+            # Clears the display itself on the way out, if asked to:
+            import Pi.aio_server as server
+            server.serve(clear=args.clear)
+        else:
+            import Pi.executor_server as server
+            server.serve()
     except KeyboardInterrupt:
-        if args.clear:
-            fastWipe()
+        if not args.asyncio:
+            stop_rendering(clear=args.clear)
         sys.exit(0)
     except Exception as e:
         # Log the exception as it is on arrival:
@@ -597,8 +974,8 @@ def run():
         traceback.print_exception(*exc_info)
         del exc_info
         # "Turn off" the strip if the -c argument was provided before exiting:
-        if args.clear:
-            fastWipe()
+        if not args.asyncio:
+            stop_rendering(clear=args.clear)
         sys.exit(0)
 
 
@@ -1,3 +1,10 @@
+import hashlib
+
+try:
+    from .colors import parse_hex, unpack_rgb_bytes
+except ImportError:  # Loaded as a top-level module, e.g. by message_bench.py
+    from colors import parse_hex, unpack_rgb_bytes
+
 
 class SceneMessage:
     def __init__(self, d):
@@ -7,6 +14,70 @@ class SceneMessage:
 
 
 class AdministrativeMessage:
+    __slots__ = ('functionCall', 'value')
+
     def __init__(self, functionCall='off', value=''):
         self.functionCall = functionCall
         self.value = value
+
+
+class Scene:
+    """ A scene decoded straight from a ChangeRequest (see decode()), with the same fields as a
+    SceneMessage; colors are packed 0xrrggbb ints, parsed and validated once on arrival.
+    """
+    __slots__ = ('Id', 'name', 'colors', 'defaultBrightness', 'animated', 'animation', 'index')
+
+    def __init__(self, Id, name, colors, defaultBrightness, animated, animation, index):
+        self.Id = Id
+        self.name = name
+        self.colors = colors
+        self.defaultBrightness = defaultBrightness
+        self.animated = animated
+        self.animation = animation
+        self.index = index
+
+
+def decode(request):
+    """ message_pb2.ChangeRequest -> Scene (if it has an id) or AdministrativeMessage, reading the
+    fields directly.  Raises ValueError for a malformed color or brightness, or a scene which
+    isn't animated and has no colors to show.
+    """
+    if not request._id:
+        return AdministrativeMessage(request.functionCall, request.value)
+
+    brightness = request.defaultBrightness
+    if not 0 <= brightness <= 255:
+        raise ValueError('Brightness {} is outside 0-255'.format(brightness))
+
+    colors = decode_colors(request)
+    if not colors and not request.animated:
+        raise ValueError('Scene {} has no colors'.format(request._id))
+
+    return Scene(request._id, request.name, colors,
+                 brightness, request.animated, request.animation, request.index)
+
+
+def decode_colors(request):
+    """ A ChangeRequest's colors as packed 0xrrggbb, from whichever of its color fields is set. """
+    if request.rgb:
+        colors = list(request.rgb)
+        if max(colors) > 0xffffff:
+            raise ValueError('rgb colors must be 0xRRGGBB')
+        return colors
+    if request.rgbBytes:
+        return unpack_rgb_bytes(request.rgbBytes)
+    return [parse_hex(color) for color in request.colors]
+
+
+def content_hash(message, brightness=None):
+    """ Hex digest of what a scene shows: its colors (however they were sent), its animation and its
+    brightness (brightness if given, else its defaultBrightness); not its Id, name or index.  Equal
+    for scenes which look the same, so it also serves as a cache key for anything computed from one.
+    """
+    colors = tuple(parse_hex(color) if isinstance(color, str) else color for color in getattr(message, 'colors', ()))
+    animation = getattr(message, 'animation', '') if getattr(message, 'animated', False) else ''
+    if brightness is None:
+        brightness = getattr(message, 'defaultBrightness', 0)
+
+    content = (colors, animation, int(brightness))
+    return hashlib.sha1(repr(content).encode('utf-8')).hexdigest()
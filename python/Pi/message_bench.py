@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+""" Cost per message of decoding a ChangeRequest: message.decode() versus the previous path
+(MessageToDict, a SceneMessage built from the dict, then parsing each hex color per channel
+as convert_to_rgb did before its cache), and of decode() for colors sent in the binary rgb
+and rgbBytes fields instead of as hex strings, with the size of each on the wire.
+
+    python3 message_bench.py [seconds per case]
+"""
+
+import sys
+import time
+
+from google.protobuf.json_format import MessageToDict
+
+import message_pb2
+from colors import to_rgb
+from message import SceneMessage, AdministrativeMessage, decode
+
+
+COLOR_COUNTS = (1, 8, 64, 300, 2000)
+
+
+# The previous path, as it was in executor_server.py and light.py:
+def construct_message(message):
+    if message.get('Id'):
+        return SceneMessage(message)
+    return AdministrativeMessage(message.get('functionCall', ''), message.get('value', ''))
+
+def hex_to_rgb(hex_color):
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+def dict_path(request):
+    message = construct_message(MessageToDict(request))
+    return [hex_to_rgb(color) for color in message.colors]
+
+def direct_path(request):
+    message = decode(request)
+    return [to_rgb(color) for color in message.colors]
+
+
+def make_requests(num_colors):
+    """ The same scene with its colors in the colors, rgb and rgbBytes fields. """
+    packed = [(i * 0x1f3d5b) & 0xffffff for i in range(num_colors)]
+    scene = dict(_id='5f0c1d2e3a4b5c6d7e8f9a0b', name='bench', defaultBrightness=200,
+                 animated=True, animation='Gradient')
+    return (
+        message_pb2.ChangeRequest(colors=['#{:06x}'.format(color) for color in packed], **scene),
+        message_pb2.ChangeRequest(rgb=packed, **scene),
+        message_pb2.ChangeRequest(rgbBytes=b''.join(color.to_bytes(3, 'big') for color in packed), **scene),
+    )
+
+
+def microseconds_per_message(decode_path, request, seconds):
+    messages = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < seconds:
+        for _ in range(100):
+            decode_path(request)
+        messages += 100
+        elapsed = time.perf_counter() - started
+    return elapsed / messages * 1e6
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+
+    print('{:>7} {:>18} {:>18} {:>18} {:>18}'.format('colors', 'dict', 'direct', 'direct rgb', 'direct rgbBytes'))
+    for count in COLOR_COUNTS:
+        hex_request, rgb_request, bytes_request = make_requests(count)
+        timings = (
+            microseconds_per_message(dict_path, hex_request, seconds),
+            microseconds_per_message(direct_path, hex_request, seconds),
+            microseconds_per_message(direct_path, rgb_request, seconds),
+            microseconds_per_message(direct_path, bytes_request, seconds),
+        )
+        sizes = (hex_request.ByteSize(), hex_request.ByteSize(), rgb_request.ByteSize(), bytes_request.ByteSize())
+        print('{:>7} {:>18} {:>18} {:>18} {:>18}'.format(count, *(
+            '{:.1f}us/{}B'.format(timing, size) for timing, size in zip(timings, sizes))))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,10 @@
 # -*- coding: utf-8 -*-
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
 # source: message.proto
-
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
 from google.protobuf import descriptor as _descriptor
-from google.protobuf import message as _message
-from google.protobuf import reflection as _reflection
+from google.protobuf import descriptor_pool as _descriptor_pool
 from google.protobuf import symbol_database as _symbol_database
 # @@protoc_insertion_point(imports)
 
@@ -13,180 +13,33 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor.FileDescriptor(
-  name='message.proto',
-  package='',
-  syntax='proto3',
-  serialized_options=None,
-  create_key=_descriptor._internal_create_key,
-  serialized_pb=b'\n\rmessage.proto\"\xae\x01\n\rChangeRequest\x12\x0b\n\x03_id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x0e\n\x06\x63olors\x18\x03 \x03(\t\x12\x19\n\x11\x64\x65\x66\x61ultBrightness\x18\x04 \x01(\x02\x12\x14\n\x0c\x66unctionCall\x18\x05 \x01(\t\x12\x10\n\x08\x61nimated\x18\x06 \x01(\x08\x12\x11\n\tanimation\x18\x07 \x01(\t\x12\r\n\x05index\x18\x08 \x01(\x05\x12\r\n\x05value\x18\t \x01(\t\"\x1e\n\x0b\x43hangeReply\x12\x0f\n\x07message\x18\x01 \x01(\t29\n\x08\x45xecutor\x12-\n\x0b\x41pplyChange\x12\x0e.ChangeRequest\x1a\x0c.ChangeReply\"\x00\x62\x06proto3'
-)
-
-
-
-
-_CHANGEREQUEST = _descriptor.Descriptor(
-  name='ChangeRequest',
-  full_name='ChangeRequest',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  create_key=_descriptor._internal_create_key,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='_id', full_name='ChangeRequest._id', index=0,
-      number=1, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='name', full_name='ChangeRequest.name', index=1,
-      number=2, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='colors', full_name='ChangeRequest.colors', index=2,
-      number=3, type=9, cpp_type=9, label=3,
-      has_default_value=False, default_value=[],
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='defaultBrightness', full_name='ChangeRequest.defaultBrightness', index=3,
-      number=4, type=2, cpp_type=6, label=1,
-      has_default_value=False, default_value=float(0),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='functionCall', full_name='ChangeRequest.functionCall', index=4,
-      number=5, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='animated', full_name='ChangeRequest.animated', index=5,
-      number=6, type=8, cpp_type=7, label=1,
-      has_default_value=False, default_value=False,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='animation', full_name='ChangeRequest.animation', index=6,
-      number=7, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='index', full_name='ChangeRequest.index', index=7,
-      number=8, type=5, cpp_type=1, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='value', full_name='ChangeRequest.value', index=8,
-      number=9, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  serialized_options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=18,
-  serialized_end=192,
-)
-
-
-_CHANGEREPLY = _descriptor.Descriptor(
-  name='ChangeReply',
-  full_name='ChangeReply',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  create_key=_descriptor._internal_create_key,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='message', full_name='ChangeReply.message', index=0,
-      number=1, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  serialized_options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=194,
-  serialized_end=224,
-)
-
-DESCRIPTOR.message_types_by_name['ChangeRequest'] = _CHANGEREQUEST
-DESCRIPTOR.message_types_by_name['ChangeReply'] = _CHANGEREPLY
-_sym_db.RegisterFileDescriptor(DESCRIPTOR)
-
-ChangeRequest = _reflection.GeneratedProtocolMessageType('ChangeRequest', (_message.Message,), {
-  'DESCRIPTOR' : _CHANGEREQUEST,
-  '__module__' : 'message_pb2'
-  # @@protoc_insertion_point(class_scope:ChangeRequest)
-  })
-_sym_db.RegisterMessage(ChangeRequest)
-
-ChangeReply = _reflection.GeneratedProtocolMessageType('ChangeReply', (_message.Message,), {
-  'DESCRIPTOR' : _CHANGEREPLY,
-  '__module__' : 'message_pb2'
-  # @@protoc_insertion_point(class_scope:ChangeReply)
-  })
-_sym_db.RegisterMessage(ChangeReply)
-
-
-
-_EXECUTOR = _descriptor.ServiceDescriptor(
-  name='Executor',
-  full_name='Executor',
-  file=DESCRIPTOR,
-  index=0,
-  serialized_options=None,
-  create_key=_descriptor._internal_create_key,
-  serialized_start=226,
-  serialized_end=283,
-  methods=[
-  _descriptor.MethodDescriptor(
-    name='ApplyChange',
-    full_name='Executor.ApplyChange',
-    index=0,
-    containing_service=None,
-    input_type=_CHANGEREQUEST,
-    output_type=_CHANGEREPLY,
-    serialized_options=None,
-    create_key=_descriptor._internal_create_key,
-  ),
-])
-_sym_db.RegisterServiceDescriptor(_EXECUTOR)
-
-DESCRIPTOR.services_by_name['Executor'] = _EXECUTOR
-
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rmessage.proto\"\xcd\x01\n\rChangeRequest\x12\x0b\n\x03_id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x0e\n\x06\x63olors\x18\x03 \x03(\t\x12\x19\n\x11\x64\x65\x66\x61ultBrightness\x18\x04 \x01(\x02\x12\x14\n\x0c\x66unctionCall\x18\x05 \x01(\t\x12\x10\n\x08\x61nimated\x18\x06 \x01(\x08\x12\x11\n\tanimation\x18\x07 \x01(\t\x12\r\n\x05index\x18\x08 \x01(\x05\x12\r\n\x05value\x18\t \x01(\t\x12\x0b\n\x03rgb\x18\n \x03(\x07\x12\x10\n\x08rgbBytes\x18\x0b \x01(\x0c\"0\n\x0b\x43hangeReply\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x10\n\x08sequence\x18\x02 \x01(\x04\".\n\x0b\x43hangeBatch\x12\x1f\n\x07\x63hanges\x18\x01 \x03(\x0b\x32\x0e.ChangeRequest\"\x1d\n\x0c\x43hangeResult\x12\r\n\x05\x65rror\x18\x01 \x01(\t\"D\n\x10\x43hangeBatchReply\x12\x1e\n\x07results\x18\x01 \x03(\x0b\x32\r.ChangeResult\x12\x10\n\x08sequence\x18\x02 \x01(\x04\"\x0f\n\rStatusRequest\"\xc0\x01\n\x0bStatusReply\x12\x0f\n\x07sceneId\x18\x01 \x01(\t\x12\x12\n\nbrightness\x18\x02 \x01(\x05\x12\x17\n\x0f\x61ppliedSequence\x18\x03 \x01(\x04\x12\x0b\n\x03\x66ps\x18\x04 \x01(\x02\x12\x12\n\nqueueDepth\x18\x05 \x01(\r\x12\x13\n\x0b\x66rameTimeMs\x18\x06 \x01(\x02\x12\x16\n\x0emaxFrameTimeMs\x18\x07 \x01(\x02\x12\x12\n\nlateFrames\x18\x08 \x01(\x04\x12\x11\n\tsceneHash\x18\t \x01(\t\"9\n\x05\x46rame\x12\x0e\n\x06pixels\x18\x01 \x01(\x0c\x12\x0f\n\x07gzipped\x18\x02 \x01(\x08\x12\x0f\n\x07indices\x18\x03 \x01(\x0c\"<\n\rStreamSummary\x12\x16\n\x0e\x66ramesReceived\x18\x01 \x01(\x04\x12\x13\n\x0b\x66ramesShown\x18\x02 \x01(\x04\"K\n\nControlAck\x12\x10\n\x08sequence\x18\x01 \x01(\x04\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12\x1c\n\x06status\x18\x03 \x01(\x0b\x32\x0c.StatusReply2\xf3\x01\n\x08\x45xecutor\x12-\n\x0b\x41pplyChange\x12\x0e.ChangeRequest\x1a\x0c.ChangeReply\"\x00\x12\x31\n\x0c\x41pplyChanges\x12\x0c.ChangeBatch\x1a\x11.ChangeBatchReply\"\x00\x12+\n\tGetStatus\x12\x0e.StatusRequest\x1a\x0c.StatusReply\"\x00\x12*\n\x0cStreamFrames\x12\x06.Frame\x1a\x0e.StreamSummary\"\x00(\x01\x12,\n\x07\x43ontrol\x12\x0e.ChangeRequest\x1a\x0b.ControlAck\"\x00(\x01\x30\x01\x62\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'message_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _CHANGEREQUEST._serialized_start=18
+  _CHANGEREQUEST._serialized_end=223
+  _CHANGEREPLY._serialized_start=225
+  _CHANGEREPLY._serialized_end=273
+  _CHANGEBATCH._serialized_start=275
+  _CHANGEBATCH._serialized_end=321
+  _CHANGERESULT._serialized_start=323
+  _CHANGERESULT._serialized_end=352
+  _CHANGEBATCHREPLY._serialized_start=354
+  _CHANGEBATCHREPLY._serialized_end=422
+  _STATUSREQUEST._serialized_start=424
+  _STATUSREQUEST._serialized_end=439
+  _STATUSREPLY._serialized_start=442
+  _STATUSREPLY._serialized_end=634
+  _FRAME._serialized_start=636
+  _FRAME._serialized_end=693
+  _STREAMSUMMARY._serialized_start=695
+  _STREAMSUMMARY._serialized_end=755
+  _CONTROLACK._serialized_start=757
+  _CONTROLACK._serialized_end=832
+  _EXECUTOR._serialized_start=835
+  _EXECUTOR._serialized_end=1078
 # @@protoc_insertion_point(module_scope)
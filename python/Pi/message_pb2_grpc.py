@@ -20,6 +20,26 @@ class ExecutorStub(object):
                 request_serializer=message__pb2.ChangeRequest.SerializeToString,
                 response_deserializer=message__pb2.ChangeReply.FromString,
                 )
+        self.ApplyChanges = channel.unary_unary(
+                '/Executor/ApplyChanges',
+                request_serializer=message__pb2.ChangeBatch.SerializeToString,
+                response_deserializer=message__pb2.ChangeBatchReply.FromString,
+                )
+        self.GetStatus = channel.unary_unary(
+                '/Executor/GetStatus',
+                request_serializer=message__pb2.StatusRequest.SerializeToString,
+                response_deserializer=message__pb2.StatusReply.FromString,
+                )
+        self.StreamFrames = channel.stream_unary(
+                '/Executor/StreamFrames',
+                request_serializer=message__pb2.Frame.SerializeToString,
+                response_deserializer=message__pb2.StreamSummary.FromString,
+                )
+        self.Control = channel.stream_stream(
+                '/Executor/Control',
+                request_serializer=message__pb2.ChangeRequest.SerializeToString,
+                response_deserializer=message__pb2.ControlAck.FromString,
+                )
 
 
 class ExecutorServicer(object):
@@ -33,6 +53,37 @@ class ExecutorServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ApplyChanges(self, request, context):
+        """Applies several changes together, at one frame boundary (e.g. a scene and a brightness,
+        without a frame of the old scene at the new brightness); none are applied if any is bad.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetStatus(self, request, context):
+        """Reports what the Raspberry Pi is currently displaying.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamFrames(self, request_iterator, context):
+        """Shows frames computed by the caller, in place of a scene, until the stream ends.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Control(self, request_iterator, context):
+        """A control session: one ControlAck for each change sent, as soon as it is queued, so callers
+        can see the Raspberry Pi falling behind (appliedSequence lagging, frame times near the
+        frame period) and hold back.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ExecutorServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -41,6 +92,26 @@ def add_ExecutorServicer_to_server(servicer, server):
                     request_deserializer=message__pb2.ChangeRequest.FromString,
                     response_serializer=message__pb2.ChangeReply.SerializeToString,
             ),
+            'ApplyChanges': grpc.unary_unary_rpc_method_handler(
+                    servicer.ApplyChanges,
+                    request_deserializer=message__pb2.ChangeBatch.FromString,
+                    response_serializer=message__pb2.ChangeBatchReply.SerializeToString,
+            ),
+            'GetStatus': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetStatus,
+                    request_deserializer=message__pb2.StatusRequest.FromString,
+                    response_serializer=message__pb2.StatusReply.SerializeToString,
+            ),
+            'StreamFrames': grpc.stream_unary_rpc_method_handler(
+                    servicer.StreamFrames,
+                    request_deserializer=message__pb2.Frame.FromString,
+                    response_serializer=message__pb2.StreamSummary.SerializeToString,
+            ),
+            'Control': grpc.stream_stream_rpc_method_handler(
+                    servicer.Control,
+                    request_deserializer=message__pb2.ChangeRequest.FromString,
+                    response_serializer=message__pb2.ControlAck.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'Executor', rpc_method_handlers)
@@ -68,3 +139,71 @@ class Executor(object):
             message__pb2.ChangeReply.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ApplyChanges(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Executor/ApplyChanges',
+            message__pb2.ChangeBatch.SerializeToString,
+            message__pb2.ChangeBatchReply.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetStatus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Executor/GetStatus',
+            message__pb2.StatusRequest.SerializeToString,
+            message__pb2.StatusReply.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamFrames(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/Executor/StreamFrames',
+            message__pb2.Frame.SerializeToString,
+            message__pb2.StreamSummary.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def Control(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/Executor/Control',
+            message__pb2.ChangeRequest.SerializeToString,
+            message__pb2.ControlAck.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -1,6 +1,7 @@
 # Adafruit NeoPixel library port to the rpi_ws281x library.
 # Author: Tony DiCola (tony@tonydicola.com), Jeremy Garff (jer@jers.net)
 import atexit
+from array import array
 
 import _rpi_ws281x as ws
 
@@ -13,6 +14,21 @@ def Color(red, green, blue, white = 0):
 	return (white << 24) | (red << 16)| (green << 8) | blue
 
 
+def gammaTable(gamma):
+	"""Return a gamma correction table for Adafruit_NeoPixel.setGamma() which
+	raises each color component (as a fraction of 255) to the power gamma.
+	"""
+	return bytes(bytearray(int(round(255 * (i / 255.0) ** gamma)) for i in range(256)))
+
+
+# Named gamma tables accepted by Adafruit_NeoPixel.setGamma().
+GAMMA_PRESETS = {
+	'linear': gammaTable(1.0),
+	'srgb': gammaTable(2.2),
+	'neopixel': gammaTable(2.8),
+}
+
+
 class _LED_Data(object):
 	"""Wrapper class which makes a SWIG LED color data array look and feel like
 	a Python list of integers.
@@ -20,15 +36,23 @@ class _LED_Data(object):
 	def __init__(self, channel, size):
 		self.size = size
 		self.channel = channel
+		# Set by every write, cleared once the data has been rendered.
+		self.dirty = True
 
 	def __getitem__(self, pos):
 		"""Return the 24-bit RGB color value at the provided position or slice
 		of positions.
 		"""
 		# Handle if a slice of positions are passed in by grabbing all the values
-		# and returning them in a list.
+		# and returning them in a list.  Contiguous slices are read in one copy.
 		if isinstance(pos, slice):
-			return [ws.ws2811_led_get(self.channel, n) for n in xrange(*pos.indices(self.size))]
+			start, stop, step = pos.indices(self.size)
+			if step == 1:
+				values = array('I', [0]) * max(stop - start, 0)
+				if values:
+					self.read(values, start)
+				return values.tolist()
+			return [ws.ws2811_led_get(self.channel, n) for n in range(start, stop, step)]
 		# Else assume the passed in value is a number to the position.
 		else:
 			return ws.ws2811_led_get(self.channel, pos)
@@ -38,27 +62,87 @@ class _LED_Data(object):
 		positions.
 		"""
 		# Handle if a slice of positions are passed in by setting the appropriate
-		# LED data values to the provided values.
+		# LED data values to the provided values.  Contiguous slices are written
+		# in one copy.
+		self.dirty = True
 		if isinstance(pos, slice):
+			start, stop, step = pos.indices(self.size)
+			if step == 1:
+				# Write no more values than the slice holds, like the loop below.
+				count = max(stop - start, 0)
+				if isinstance(value, (bytes, bytearray, memoryview, array)):
+					value = memoryview(value).cast('B')[:count * 4]
+				else:
+					value = array('I', value[:count])
+				if len(value):
+					self.write(value, start)
+				return
 			index = 0
-			for n in xrange(*pos.indices(self.size)):
+			for n in range(start, stop, step):
 				ws.ws2811_led_set(self.channel, n, value[index])
 				index += 1
 		# Else assume the passed in value is a number to the position.
 		else:
 			return ws.ws2811_led_set(self.channel, pos, value)
 
+	def write(self, buffer, start=0):
+		"""Copy a buffer of 32-bit color values into the LED data starting at
+		position start.  Returns the number of LEDs written.
+		"""
+		self.dirty = True
+		count = ws.ws2811_leds_set(self.channel, start, buffer)
+		if count < 0:
+			raise ValueError('Buffer does not fit LED data at position {0}'.format(start))
+		return count
+
+	def read(self, buffer, start=0):
+		"""Copy 32-bit color values from the LED data starting at position start
+		into a writable buffer.  Returns the number of LEDs read.
+		"""
+		count = ws.ws2811_leds_get(self.channel, start, buffer)
+		if count < 0:
+			raise ValueError('Buffer does not fit LED data at position {0}'.format(start))
+		return count
+
+
+class EncodedFrame(object):
+	"""Frame encoded once by Adafruit_NeoPixel.captureFrame(), which can be
+	sent any number of times with Adafruit_NeoPixel.showFrame() for the cost
+	of a copy into the DMA buffer.
+	"""
+	def __init__(self, handle):
+		self._handle = handle
+
+	def __len__(self):
+		"""Return the size of the encoded data in bytes, one full DMA buffer."""
+		if self._handle is None:
+			return 0
+		return ws.ws2811_frame_size(self._handle)
+
+	def free(self):
+		"""Free the encoded data; done automatically when garbage collected."""
+		if self._handle is not None:
+			ws.ws2811_frame_free(self._handle)
+			self._handle = None
+
+	def __del__(self):
+		self.free()
+
 
 class Adafruit_NeoPixel(object):
 	def __init__(self, num, pin, freq_hz=800000, dma=10, invert=False,
-			brightness=255, channel=0, strip_type=ws.WS2811_STRIP_RGB):
+			brightness=255, channel=0, strip_type=ws.WS2811_STRIP_RGB,
+			double_buffer=False):
 		"""Class to represent a NeoPixel/WS281x LED display.  Num should be the
 		number of pixels in the display, and pin should be the GPIO pin connected
 		to the display signal line (must be a PWM pin like 18!).  Optional
 		parameters are freq, the frequency of the display signal in hertz (default
 		800khz), dma, the DMA channel to use (default 10), invert, a boolean
-		specifying if the signal line should be inverted (default False), and
-		channel, the PWM channel to use (defaults to 0).
+		specifying if the signal line should be inverted (default False),
+		channel, the PWM channel to use (defaults to 0), and double_buffer, a
+		boolean specifying if a second DMA buffer should be allocated so frames
+		can be encoded while the previous one is sent (default False, needed
+		for show(block=False)).
 		"""
 		# Create ws2811_t structure and fill in parameters.
 		self._leds = ws.new_ws2811_t()
@@ -82,20 +166,47 @@ class Adafruit_NeoPixel(object):
 		# Initialize the controller
 		ws.ws2811_t_freq_set(self._leds, freq_hz)
 		ws.ws2811_t_dmanum_set(self._leds, dma)
+		ws.ws2811_t_double_buffer_set(self._leds, 1 if double_buffer else 0)
 
 		# Grab the led data array.
 		self._led_data = _LED_Data(self._channel, num)
 
+		# Zero-copy views of the driver LED buffer, created on demand.
+		self._raw_view = None
+		self._pixel_view = None
+
+		# Render bookkeeping for show().
+		self._dirty = True
+		# Set while a frame from show(block=False) may still be queued.
+		self._async_pending = False
+		self._renders_issued = 0
+		self._renders_skipped = 0
+
 		# Substitute for __del__, traps an exit condition and cleans up properly
 		atexit.register(self._cleanup)
 
 	def _cleanup(self):
 		# Clean up memory used by the library when not needed anymore.
 		if self._leds is not None:
+			self._release_views()
 			ws.delete_ws2811_t(self._leds)
 			self._leds = None
 			self._channel = None
 
+	def _release_views(self):
+		# Invalidate any view handed out by getPixelView so it can't be used to
+		# write into the LED buffer after the strip is gone.  A view that is
+		# still exported (e.g. wrapped by a NumPy array) can't be released; the
+		# LED buffer itself is never freed here, so such arrays stay harmless.
+		for view in (self._pixel_view, self._raw_view):
+			if view is not None:
+				try:
+					view.release()
+				except BufferError:
+					pass
+		self._pixel_view = None
+		self._raw_view = None
+
 	def begin(self):
 		"""Initialize library, must be called once before other functions are
 		called.
@@ -105,12 +216,65 @@ class Adafruit_NeoPixel(object):
 			message = ws.ws2811_get_return_t_str(resp)
 			raise RuntimeError('ws2811_init failed with code {0} ({1})'.format(resp, message))
 
-	def show(self):
-		"""Update the display with the data from the LED buffer."""
-		resp = ws.ws2811_render(self._leds)
+	def show(self, block=True, force=False):
+		"""Update the display with the data from the LED buffer.  With
+		block=False and double buffering enabled, don't wait for the previous
+		frame to finish: the frame is queued and sent as soon as the hardware
+		is free (on a later show() or wait()).
+
+		Nothing is rendered if neither the LED data nor the brightness changed
+		since the last call, unless force is set or a frame queued by
+		show(block=False) may not have been sent yet.  Writes through the view
+		from getPixelView() can't be seen, so once a view exists every call
+		renders.
+		"""
+		if not (force or self._dirty or self._led_data.dirty or self._async_pending or self._pixel_view is not None):
+			self._renders_skipped += 1
+			return
+		self._dirty = False
+		self._led_data.dirty = False
+		self._renders_issued += 1
+		if block:
+			resp = ws.ws2811_render(self._leds)
+			name = 'ws2811_render'
+		else:
+			resp = ws.ws2811_render_async(self._leds)
+			name = 'ws2811_render_async'
+		self._async_pending = not block
+		if resp != ws.WS2811_SUCCESS:
+			message = ws.ws2811_get_return_t_str(resp)
+			raise RuntimeError('{0} failed with code {1} ({2})'.format(name, resp, message))
+
+	def wait(self):
+		"""Block until every frame passed to show() has been sent to the LEDs."""
+		resp = ws.ws2811_wait(self._leds)
+		self._async_pending = False
 		if resp != ws.WS2811_SUCCESS:
 			message = ws.ws2811_get_return_t_str(resp)
-			raise RuntimeError('ws2811_render failed with code {0} ({1})'.format(resp, message))
+			raise RuntimeError('ws2811_wait failed with code {0} ({1})'.format(resp, message))
+
+	def captureFrame(self):
+		"""Encode the LED buffer, at the current brightness, into an
+		EncodedFrame for showFrame().  Lets a static scene or a short loop be
+		encoded once and replayed with next to no CPU.
+		"""
+		handle = ws.ws2811_frame_capture(self._leds)
+		if handle is None:
+			raise MemoryError('ws2811_frame_capture failed')
+		return EncodedFrame(handle)
+
+	def showFrame(self, frame):
+		"""Update the display with a frame from captureFrame(), blocking like
+		show().  The LED buffer is left as it was, so the next show() renders
+		it again.
+		"""
+		self._dirty = True
+		self._async_pending = False
+		self._renders_issued += 1
+		resp = ws.ws2811_frame_render(self._leds, frame._handle)
+		if resp != ws.WS2811_SUCCESS:
+			message = ws.ws2811_get_return_t_str(resp)
+			raise RuntimeError('ws2811_frame_render failed with code {0} ({1})'.format(resp, message))
 
 	def setPixelColor(self, n, color):
 		"""Set LED at position n to the provided 24-bit color value (in RGB order).
@@ -128,7 +292,30 @@ class Adafruit_NeoPixel(object):
 		"""Scale each LED in the buffer by the provided brightness.  A brightness
 		of 0 is the darkest and 255 is the brightest.
 		"""
-		ws.ws2811_channel_t_brightness_set(self._channel, brightness)
+		if brightness != self.getBrightness():
+			ws.ws2811_channel_t_brightness_set(self._channel, brightness)
+			self._dirty = True
+
+	def setGamma(self, table):
+		"""Set the gamma correction table, 256 values from 0 to 255 giving the
+		value sent for each color component after brightness scaling.  Takes
+		any sequence of ints or buffer of bytes, or the name of one of the
+		GAMMA_PRESETS.  The driver folds brightness and gamma into one table,
+		rebuilt only when either changes.
+		"""
+		if isinstance(table, str):
+			table = GAMMA_PRESETS[table]
+		table = bytes(bytearray(table))
+		if ws.ws2811_gamma_set(self._channel, table) != 0:
+			raise ValueError('Gamma table must have 256 entries')
+		self._dirty = True
+
+	def getGamma(self):
+		"""Get the gamma correction table as 256 bytes."""
+		table = bytearray(256)
+		if ws.ws2811_gamma_get(self._channel, table) != 0:
+			return GAMMA_PRESETS['linear']
+		return bytes(table)
 
 	def getBrightness(self):
 		"""Get the brightness value for each LED in the buffer. A brightness
@@ -136,11 +323,51 @@ class Adafruit_NeoPixel(object):
 		"""
 		return ws.ws2811_channel_t_brightness_get(self._channel)
 
-	def getPixels(self):
+	def setPixels(self, buffer, start=0):
+		"""Set consecutive LEDs from position start to the 32-bit color values in
+		buffer with a single copy.  The buffer can be any object supporting the
+		buffer protocol with 32-bit items, e.g. array('I'), a NumPy uint32 array
+		or bytes holding native-endian words.
+		"""
+		self._led_data.write(buffer, start)
+
+	def getPixels(self, buffer=None, start=0):
 		"""Return an object which allows access to the LED display data as if
-		it were a sequence of 24-bit RGB values.
+		it were a sequence of 24-bit RGB values.  If a writable buffer is given
+		instead, fill it with the color values from position start with a single
+		copy and return it.
+		"""
+		if buffer is None:
+			return self._led_data
+		self._led_data.read(buffer, start)
+		return buffer
+
+	def getPixelView(self):
+		"""Return a writable memoryview of 32-bit color values which maps the
+		driver's LED buffer directly, so values written to it are picked up by
+		the next call to show() without any copy.  Only valid after begin()
+		and until the strip is cleaned up.
+		"""
+		if self._pixel_view is None:
+			view = ws.ws2811_leds_view(self._channel)
+			if view is None:
+				raise RuntimeError('LED buffer is not allocated, call begin() first')
+			self._raw_view = view
+			self._pixel_view = view.cast('I')
+		return self._pixel_view
+
+	def getPixelArray(self):
+		"""Return a NumPy uint32 array sharing memory with the driver's LED
+		buffer, see getPixelView().  Requires NumPy.
+		"""
+		import numpy
+		return numpy.frombuffer(self.getPixelView(), dtype=numpy.uint32)
+
+	def getRenderStats(self):
+		"""Return a dict with the number of show() calls that rendered a frame
+		('issued') and that were skipped because nothing changed ('skipped').
 		"""
-		return self._led_data
+		return {'issued': self._renders_issued, 'skipped': self._renders_skipped}
 
 	def numPixels(self):
 		"""Return the number of pixels in the display."""
@@ -0,0 +1,236 @@
+""" Fixed-rate frame scheduling for the animations in light.py. """
+
+import asyncio
+import threading
+import time
+
+
+# Protocol timing, matching the driver (ws2811.c):
+WS2811_FREQ_HZ = 800000      # One bit per period at 800khz -> 1.25us per bit
+RESET_TIME_S = 300 / 1000000.0  # Latch time the driver waits between frames
+
+DEFAULT_FPS = 60
+# Weight of the latest frame in the running average of frame times:
+FRAME_TIME_SMOOTHING = 0.1
+
+
+def max_fps(led_count, freq_hz=WS2811_FREQ_HZ, colors_per_led=3):
+    """ Highest frame rate the wire protocol allows for a strip of led_count LEDs. """
+    frame_time = led_count * colors_per_led * 8 / float(freq_hz) + RESET_TIME_S
+    return 1.0 / frame_time
+
+
+class FrameScheduler:
+    """ Drives an animation at a fixed frame rate.
+
+    Animations are iterables (usually generators) which set the pixels of one
+    frame per step; the scheduler calls strip.show() once per step and then
+    sleeps until the frame's absolute deadline on the monotonic clock, so the
+    rate doesn't drift with the time spent computing frames.
+
+    Time-based animations are functions of the elapsed time instead (see
+    run_timed); when they fall behind, frames are dropped rather than slowing
+    the animation down.  They may return a frame pre-encoded with
+    strip.captureFrame(), which is then sent as-is instead of calling show().
+
+    run_async and run_timed_async do the same on an asyncio event loop.
+
+    Setting stop_event ends the animation after the current frame; the wait
+    between frames is on the event, so it doesn't hold up a scene change.
+    on_first_frame is called once, right after the first frame is shown, and
+    between_frames before computing every frame after the first (e.g. to
+    apply commands which arrived in the meantime, or set stop_event).
+    """
+
+    def __init__(self, strip, fps=DEFAULT_FPS, stop_event=None, freq_hz=WS2811_FREQ_HZ,
+                 on_first_frame=None, between_frames=None):
+        self.strip = strip
+        self.fps = min(float(fps), max_fps(strip.numPixels(), freq_hz))
+        self.frame_time = 1.0 / self.fps
+        self.stop_event = stop_event or threading.Event()
+        self.on_first_frame = on_first_frame
+        self.between_frames = between_frames
+
+        self.frames_shown = 0
+        self.late_frames = 0
+        self.dropped_frames = 0
+        # Time spent computing and showing a frame, in seconds (a moving average, and the longest):
+        self.frame_work_time = 0.0
+        self.max_frame_work_time = 0.0
+        self._running_time = 0.0
+        self._run_started = None
+
+    def run(self, frames):
+        """ Show each frame produced by frames on schedule, until it is exhausted or stop_event is set. """
+        started = self._run_started = time.monotonic()
+        deadline = started
+        work_started = started
+
+        try:
+            for _ in frames:
+                self.strip.show()
+                self._frame_shown(work_started)
+
+                deadline += self.frame_time
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self.stop_event.wait(remaining)
+                else:
+                    # Missed the deadline; restart the schedule from now rather
+                    #   than rushing the following frames to catch up.
+                    self.late_frames += 1
+                    deadline = time.monotonic()
+
+                if self.between_frames is not None:
+                    self.between_frames()
+                if self.stop_event.is_set():
+                    break
+                work_started = time.monotonic()
+        finally:
+            self._running_time += time.monotonic() - started
+            self._run_started = None
+
+    def run_timed(self, render, duration=None):
+        """ Show render(t) on schedule, t being the seconds from the start to the frame's deadline,
+        until duration seconds have passed (forever if None) or stop_event is set.
+        """
+        started = self._run_started = time.monotonic()
+        deadline = started
+
+        try:
+            while not self.stop_event.is_set():
+                elapsed = deadline - started
+                if duration is not None and elapsed >= duration:
+                    break
+
+                work_started = time.monotonic()
+                frame = render(elapsed)
+                if frame is None:
+                    self.strip.show()
+                else:
+                    self.strip.showFrame(frame)
+                self._frame_shown(work_started)
+
+                deadline += self.frame_time
+                now = time.monotonic()
+                if deadline < now:
+                    # Skip the deadlines already missed, so the animation keeps
+                    #   pace with the clock instead of stretching out.
+                    missed = int((now - deadline) / self.frame_time) + 1
+                    self.late_frames += 1
+                    self.dropped_frames += missed
+                    deadline += missed * self.frame_time
+                self.stop_event.wait(deadline - now)
+
+                if self.between_frames is not None:
+                    self.between_frames()
+        finally:
+            self._running_time += time.monotonic() - started
+            self._run_started = None
+
+    async def run_async(self, frames, call):
+        """ As run(), on an asyncio event loop: call(fn) runs fn in the thread owning the strip
+        (e.g. a single worker executor) and is awaited for each frame, and the wait between frames
+        is an asyncio sleep, so cancelling the task ends the animation.
+        """
+        frames = iter(frames)
+
+        def step():
+            for _ in frames:
+                self.strip.show()
+                return True
+            return False
+
+        started = self._run_started = time.monotonic()
+        deadline = started
+        work_started = started
+
+        try:
+            while await call(step):
+                self._frame_shown(work_started)
+
+                deadline += self.frame_time
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+                else:
+                    self.late_frames += 1
+                    deadline = time.monotonic()
+
+                if self.between_frames is not None:
+                    await call(self.between_frames)
+                if self.stop_event.is_set():
+                    break
+                work_started = time.monotonic()
+        finally:
+            self._running_time += time.monotonic() - started
+            self._run_started = None
+
+    async def run_timed_async(self, render, call, duration=None):
+        """ As run_timed(), on an asyncio event loop; see run_async(). """
+        def step(elapsed):
+            frame = render(elapsed)
+            if frame is None:
+                self.strip.show()
+            else:
+                self.strip.showFrame(frame)
+
+        started = self._run_started = time.monotonic()
+        deadline = started
+
+        try:
+            while not self.stop_event.is_set():
+                elapsed = deadline - started
+                if duration is not None and elapsed >= duration:
+                    break
+
+                work_started = time.monotonic()
+                await call(step, elapsed)
+                self._frame_shown(work_started)
+
+                deadline += self.frame_time
+                now = time.monotonic()
+                if deadline < now:
+                    missed = int((now - deadline) / self.frame_time) + 1
+                    self.late_frames += 1
+                    self.dropped_frames += missed
+                    deadline += missed * self.frame_time
+                await asyncio.sleep(deadline - now)
+
+                if self.between_frames is not None:
+                    await call(self.between_frames)
+        finally:
+            self._running_time += time.monotonic() - started
+            self._run_started = None
+
+    def _frame_shown(self, work_started):
+        work_time = time.monotonic() - work_started
+        if self.frames_shown == 0:
+            self.frame_work_time = work_time
+        else:
+            self.frame_work_time += (work_time - self.frame_work_time) * FRAME_TIME_SMOOTHING
+        self.max_frame_work_time = max(self.max_frame_work_time, work_time)
+
+        self.frames_shown += 1
+        if self.frames_shown == 1 and self.on_first_frame is not None:
+            self.on_first_frame()
+
+    def achieved_fps(self):
+        """ Frames shown per second so far, including any run still in progress. """
+        running_time = self._running_time
+        if self._run_started is not None:
+            running_time += time.monotonic() - self._run_started
+        if running_time <= 0:
+            return 0.0
+        return self.frames_shown / running_time
+
+    def stats(self):
+        return {
+            'target_fps': round(self.fps, 2),
+            'achieved_fps': round(self.achieved_fps(), 2),
+            'frames': self.frames_shown,
+            'late_frames': self.late_frames,
+            'dropped_frames': self.dropped_frames,
+            'frame_ms': round(self.frame_work_time * 1000, 2),
+            'max_frame_ms': round(self.max_frame_work_time * 1000, 2),
+        }
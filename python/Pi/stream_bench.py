@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+""" Sustained frames per second of the StreamFrames RPC over loopback, for dense frames,
+gzip-compressed frames and sparse deltas.  Serves a stand-in Executor which only decodes the
+frames (no hardware needed); pass the address of a running light server to measure that instead.
+
+    python3 stream_bench.py [seconds per case] [host:port]
+"""
+
+from concurrent import futures
+import gzip
+import sys
+import time
+
+import grpc
+import numpy as np
+
+import message_pb2
+import message_pb2_grpc
+from framestream import FrameStream
+
+
+PIXEL_COUNTS = (300, 2000)
+# Share of the LEDs changing per frame in the sparse case:
+SPARSE_FRACTION = 0.05
+
+
+class DecodingExecutor(message_pb2_grpc.ExecutorServicer):
+    """ Decodes streamed frames like the light server, without a strip to show them on. """
+    def __init__(self, num_pixels):
+        self.num_pixels = num_pixels
+
+    def StreamFrames(self, request_iterator, context):
+        stream = FrameStream(self.num_pixels)
+        for frame in request_iterator:
+            stream.push(frame.pixels, frame.gzipped, frame.indices)
+        stream.close()
+        return message_pb2.StreamSummary(**stream.stats())
+
+
+def dense_frames(num_pixels, gzipped=False):
+    j = 0
+    while True:
+        # A moving gradient, so compression has something realistic to work with:
+        pixels = ((np.arange(num_pixels, dtype=np.uint32) + j) & 255) * 0x010101
+        data = pixels.astype('<u4').tobytes()
+        yield message_pb2.Frame(pixels=gzip.compress(data, 1) if gzipped else data, gzipped=gzipped)
+        j += 1
+
+def sparse_frames(num_pixels):
+    changed = max(1, int(num_pixels * SPARSE_FRACTION))
+    j = 0
+    while True:
+        indices = (np.arange(changed, dtype=np.uint32) * 7 + j) % num_pixels
+        pixels = np.full(changed, j & 255, dtype=np.uint32)
+        yield message_pb2.Frame(pixels=pixels.astype('<u4').tobytes(), indices=indices.astype('<u4').tobytes())
+        j += 1
+
+CASES = (
+    ('dense', lambda n: dense_frames(n)),
+    ('gzip', lambda n: dense_frames(n, gzipped=True)),
+    ('sparse', sparse_frames),
+)
+
+
+def for_seconds(frames, seconds, sizes):
+    started = time.perf_counter()
+    for frame in frames:
+        sizes.append(frame.ByteSize())
+        yield frame
+        if time.perf_counter() - started >= seconds:
+            return
+
+def frames_per_second(stub, frames, seconds):
+    sizes = []
+    started = time.perf_counter()
+    summary = stub.StreamFrames(for_seconds(frames, seconds, sizes))
+    elapsed = time.perf_counter() - started
+    return summary.framesReceived / elapsed, sum(sizes) / max(len(sizes), 1)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    target = sys.argv[2] if len(sys.argv) > 2 else None
+
+    print('{:<8} {:>7} {:>12} {:>14}'.format('frames', 'pixels', 'frames/s', 'bytes/frame'))
+    for count in PIXEL_COUNTS:
+        server = None
+        address = target
+        if address is None:
+            server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+            message_pb2_grpc.add_ExecutorServicer_to_server(DecodingExecutor(count), server)
+            address = 'localhost:{}'.format(server.add_insecure_port('localhost:0'))
+            server.start()
+
+        with grpc.insecure_channel(address) as channel:
+            stub = message_pb2_grpc.ExecutorStub(channel)
+            for name, frames in CASES:
+                rate, size = frames_per_second(stub, frames(count), seconds)
+                print('{:<8} {:>7} {:>12.1f} {:>14.0f}'.format(name, count, rate, size))
+
+        if server is not None:
+            server.stop(None)
+
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,42 @@
 // Process ws2811.h header and export all included functions.
 %include "../ws2811.h"
 
+// Accept any object exporting the buffer protocol (bytes, bytearray, array('I'),
+// NumPy arrays, memoryviews) as a contiguous block of raw LED data.  The buffer
+// is held for the duration of the call only.
+%typemap(arginit) (const void *data, size_t size), (void *data, size_t size)
+{
+    view$argnum.obj = NULL;
+}
+
+%typemap(in) (const void *data, size_t size) (Py_buffer view)
+{
+    if (PyObject_GetBuffer($input, &view, PyBUF_C_CONTIGUOUS) != 0)
+    {
+        SWIG_fail;
+    }
+    $1 = view.buf;
+    $2 = view.len;
+}
+
+%typemap(in) (void *data, size_t size) (Py_buffer view)
+{
+    if (PyObject_GetBuffer($input, &view, PyBUF_C_CONTIGUOUS | PyBUF_WRITABLE) != 0)
+    {
+        SWIG_fail;
+    }
+    $1 = view.buf;
+    $2 = view.len;
+}
+
+%typemap(freearg) (const void *data, size_t size), (void *data, size_t size)
+{
+    if (view$argnum.obj)
+    {
+        PyBuffer_Release(&view$argnum);
+    }
+}
+
 %inline %{
     uint32_t ws2811_led_get(ws2811_channel_t *channel, int lednum)
     {
@@ -41,6 +77,83 @@
         return 0;
     }
 
+    int ws2811_leds_set(ws2811_channel_t *channel, int start, const void *data, size_t size)
+    {
+        size_t count = size / sizeof(ws2811_led_t);
+
+        if (!channel->leds || (size % sizeof(ws2811_led_t)) ||
+            (start < 0) || (start + count > (size_t)channel->count))
+        {
+            return -1;
+        }
+
+        memcpy(&channel->leds[start], data, size);
+
+        return count;
+    }
+
+    int ws2811_leds_get(ws2811_channel_t *channel, int start, void *data, size_t size)
+    {
+        size_t count = size / sizeof(ws2811_led_t);
+
+        if (!channel->leds || (size % sizeof(ws2811_led_t)) ||
+            (start < 0) || (start + count > (size_t)channel->count))
+        {
+            return -1;
+        }
+
+        memcpy(data, &channel->leds[start], size);
+
+        return count;
+    }
+
+    PyObject *ws2811_leds_view(ws2811_channel_t *channel)
+    {
+        if (!channel->leds)
+        {
+            Py_RETURN_NONE;
+        }
+
+        // Writable view straight onto the driver owned LED buffer, no copy.
+        return PyMemoryView_FromMemory((char *)channel->leds,
+                                       sizeof(ws2811_led_t) * channel->count,
+                                       PyBUF_WRITE);
+    }
+
+    int ws2811_gamma_set(ws2811_channel_t *channel, const void *data, size_t size)
+    {
+        if (size != 256)
+        {
+            return -1;
+        }
+
+        // Allocated here when set before ws2811_init(), which then keeps it.
+        if (!channel->gamma)
+        {
+            channel->gamma = malloc(256);
+            if (!channel->gamma)
+            {
+                return -1;
+            }
+        }
+
+        memcpy(channel->gamma, data, size);
+
+        return 0;
+    }
+
+    int ws2811_gamma_get(ws2811_channel_t *channel, void *data, size_t size)
+    {
+        if (!channel->gamma || (size != 256))
+        {
+            return -1;
+        }
+
+        memcpy(data, channel->gamma, size);
+
+        return 0;
+    }
+
     ws2811_channel_t *ws2811_channel_get(ws2811_t *ws, int channelnum)
     {
         return &ws->channel[channelnum];
@@ -0,0 +1,20 @@
+import os
+import sys
+import types
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# The Pi package, and the modules it imports as top-level ones (neopixel, message_pb2):
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), 'Pi'))
+sys.path.insert(0, HERE)
+
+# Off the Raspberry Pi the driver extension isn't built; tests replace it with fake_ws281x anyway:
+try:
+    import _rpi_ws281x
+except ImportError:
+    import fake_ws281x
+    sys.modules['_rpi_ws281x'] = fake_ws281x
+
+# animations.py imports light.py as a top-level module, which fails on its relative imports;
+#   Pi.light imports it without using it:
+sys.modules.setdefault('animations', types.ModuleType('animations'))
@@ -0,0 +1,181 @@
+""" Stand-in for the _rpi_ws281x extension, so neopixel.py can be tested off the Raspberry Pi.
+
+Models a double-buffered driver whose hardware is always busy: ws2811_render_async() leaves its
+frame queued until the next ws2811_render() (which replaces it) or ws2811_wait() (which sends it).
+Sent frames are recorded in the device's sent list as (brightness, colors) tuples.
+"""
+
+from array import array
+
+
+WS2811_SUCCESS = 0
+WS2811_ERROR_GENERIC = -1
+WS2811_STRIP_RGB = 0x00100800
+
+
+class Channel:
+    def __init__(self):
+        self.count = 0
+        self.gpionum = 0
+        self.invert = 0
+        self.brightness = 0
+        self.strip_type = WS2811_STRIP_RGB
+        self.gamma = bytes(range(256))
+        self.leds = array('I')
+
+
+class Device:
+    def __init__(self):
+        self.channels = [Channel(), Channel()]
+        self.freq = 0
+        self.dmanum = 0
+        self.double_buffer = 0
+        self.pending = None
+        self.sent = []
+
+    def frame(self):
+        channel = self.channels[0]
+        return channel.brightness, tuple(channel.leds)
+
+
+def new_ws2811_t():
+    return Device()
+
+
+def delete_ws2811_t(device):
+    pass
+
+
+def ws2811_channel_get(device, channum):
+    return device.channels[channum]
+
+
+def ws2811_channel_t_count_set(channel, count):
+    channel.count = count
+    channel.leds = array('I', [0]) * count
+
+
+def ws2811_channel_t_count_get(channel):
+    return channel.count
+
+
+def ws2811_channel_t_gpionum_set(channel, gpionum):
+    channel.gpionum = gpionum
+
+
+def ws2811_channel_t_invert_set(channel, invert):
+    channel.invert = invert
+
+
+def ws2811_channel_t_brightness_set(channel, brightness):
+    channel.brightness = brightness
+
+
+def ws2811_channel_t_brightness_get(channel):
+    return channel.brightness
+
+
+def ws2811_channel_t_strip_type_set(channel, strip_type):
+    channel.strip_type = strip_type
+
+
+def ws2811_t_freq_set(device, freq):
+    device.freq = freq
+
+
+def ws2811_t_dmanum_set(device, dmanum):
+    device.dmanum = dmanum
+
+
+def ws2811_t_double_buffer_set(device, double_buffer):
+    device.double_buffer = double_buffer
+
+
+def ws2811_init(device):
+    return WS2811_SUCCESS
+
+
+def ws2811_get_return_t_str(resp):
+    return 'fake error {}'.format(resp)
+
+
+def ws2811_render(device):
+    device.pending = None
+    device.sent.append(device.frame())
+    return WS2811_SUCCESS
+
+
+def ws2811_render_async(device):
+    if not device.double_buffer:
+        return WS2811_ERROR_GENERIC
+    device.pending = device.frame()
+    return WS2811_SUCCESS
+
+
+def ws2811_wait(device):
+    if device.pending is not None:
+        device.sent.append(device.pending)
+        device.pending = None
+    return WS2811_SUCCESS
+
+
+def ws2811_frame_capture(device):
+    return device.frame()
+
+
+def ws2811_frame_render(device, frame):
+    device.pending = None
+    device.sent.append(frame)
+    return WS2811_SUCCESS
+
+
+def ws2811_frame_free(frame):
+    pass
+
+
+def ws2811_frame_size(frame):
+    # As for PWM: 3 color bytes per LED, 3 bits per bit of color:
+    return len(frame[1]) * 9
+
+
+def ws2811_led_set(channel, n, color):
+    channel.leds[n] = color
+    return 0
+
+
+def ws2811_led_get(channel, n):
+    return channel.leds[n]
+
+
+def ws2811_leds_set(channel, start, buffer):
+    data = memoryview(buffer).cast('B')
+    count = len(data) // 4
+    if len(data) % 4 or start < 0 or start + count > channel.count:
+        return -1
+    channel.leds[start:start + count] = array('I', data.tobytes())
+    return count
+
+
+def ws2811_leds_get(channel, start, buffer):
+    data = memoryview(buffer).cast('B')
+    count = len(data) // 4
+    if len(data) % 4 or start < 0 or start + count > channel.count:
+        return -1
+    data[:] = channel.leds[start:start + count].tobytes()
+    return count
+
+
+def ws2811_leds_view(channel):
+    return memoryview(channel.leds).cast('B')
+
+
+def ws2811_gamma_set(channel, table):
+    if len(table) != 256:
+        return -1
+    channel.gamma = bytes(table)
+    return 0
+
+
+def ws2811_gamma_get(channel, buffer):
+    buffer[:] = channel.gamma
+    return 0
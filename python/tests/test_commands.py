@@ -0,0 +1,42 @@
+import queue
+
+import pytest
+
+from Pi.commands import CommandMailbox, SceneCommand, BrightnessCommand, OffCommand
+from Pi.message import SceneMessage
+
+
+def scene(color):
+    return SceneCommand(SceneMessage({'Id': color, 'colors': [color], 'defaultBrightness': 100}))
+
+
+def test_newest_scene_replaces_older_ones():
+    mailbox = CommandMailbox()
+    mailbox.put(scene('#ff0000'))
+    newest = scene('#00ff00')
+    mailbox.put(newest)
+
+    assert mailbox.get_nowait() is newest
+    assert mailbox.stats() == {'received': 2, 'coalesced': 1, 'dropped': 0}
+
+
+def test_off_is_handed_out_before_shutdown():
+    mailbox = CommandMailbox()
+    mailbox.put(BrightnessCommand(10))
+    off = OffCommand()
+    mailbox.put(off)
+    mailbox.put(None)
+
+    assert mailbox.get_nowait() is off
+    assert mailbox.get_nowait() is None
+
+
+def test_shutdown_is_handed_out_once():
+    mailbox = CommandMailbox()
+    mailbox.put(None)
+
+    assert mailbox.get_nowait() is None
+    with pytest.raises(queue.Empty):
+        mailbox.get_nowait()
+    with pytest.raises(queue.Empty):
+        mailbox.get(timeout=0.01)
@@ -0,0 +1,13 @@
+from Pi import executor_server
+
+
+def test_logger_is_configured_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(executor_server, 'LOG_LOCATION', str(tmp_path / 'server.log'))
+    monkeypatch.setattr(executor_server.logger, 'handlers', [])
+
+    executor_server.configure_logger()
+    executor_server.configure_logger()
+
+    assert len(executor_server.logger.handlers) == 1
+    assert executor_server.logger.handlers[0].baseFilename == str(tmp_path / 'server.log')
+    executor_server.logger.handlers[0].close()
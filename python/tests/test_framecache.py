@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+
+from Pi.framecache import FrameCache, HEADER
+
+
+def render(value, led_count=4):
+    return lambda i: np.full(led_count, value + i, dtype=np.uint32)
+
+
+def test_scene_is_compiled_once_and_replayed(tmp_path):
+    cache = FrameCache(str(tmp_path))
+    scene = cache.get('scene', 4, 10, 3, render(1))
+
+    assert len(scene) == 3
+    assert np.frombuffer(scene.frame(4), dtype=np.uint32).tolist() == [2] * 4
+    assert cache.get('scene', 4, 10, 3, render(100)) is scene
+    cache.close()
+
+
+def test_file_compiled_with_other_parameters_is_compiled_again(tmp_path):
+    FrameCache(str(tmp_path)).get('scene', 4, 10, 3, render(1)).close()
+
+    scene = FrameCache(str(tmp_path)).get('scene', 4, 20, 5, render(7))
+
+    assert (scene.fps, len(scene)) == (20, 5)
+    assert np.frombuffer(scene.frame(0), dtype=np.uint32).tolist() == [7] * 4
+    scene.close()
+
+
+def test_least_recently_used_scenes_are_evicted(tmp_path):
+    scene_bytes = HEADER.size + 2 * 4 * 4
+    cache = FrameCache(str(tmp_path), max_bytes=2 * scene_bytes)
+    first = cache.get('first', 4, 10, 2, render(1))
+    cache.get('second', 4, 10, 2, render(2))
+    # Makes 'second' the least recently used:
+    os.utime(cache.path_for('second', 4), (0, 0))
+
+    cache.get('third', 4, 10, 2, render(3))
+
+    assert sorted(os.listdir(str(tmp_path))) == sorted(os.path.basename(cache.path_for(key, 4)) for key in ('first', 'third'))
+    assert cache.evicted == 1
+    assert cache.get('first', 4, 10, 2, render(1)) is first
+    cache.close()
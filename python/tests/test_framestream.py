@@ -0,0 +1,45 @@
+import gzip
+
+import numpy as np
+import pytest
+
+from Pi.framestream import FrameStream
+
+
+def pack(colors):
+    return np.asarray(colors, dtype='<u4').tobytes()
+
+
+def test_pixels_are_little_endian():
+    stream = FrameStream(2)
+    stream.push(b'\x03\x02\x01\x00\x06\x05\x04\x00')
+
+    assert stream.pixels.tolist() == [0x010203, 0x040506]
+
+
+def test_gzipped_frame_is_decompressed():
+    stream = FrameStream(3)
+    stream.push(gzip.compress(pack([1, 2, 3])), gzipped=True)
+
+    assert stream.pixels.tolist() == [1, 2, 3]
+
+
+def test_sparse_frame_sets_just_its_leds():
+    stream = FrameStream(4)
+    stream.push(pack([7, 9]), indices=pack([3, 1]))
+
+    assert stream.pixels.tolist() == [0, 9, 0, 7]
+
+
+@pytest.mark.parametrize('data', [
+    # Inflates to far more than one color per LED:
+    gzip.compress(bytes(1024 * 1024)),
+    gzip.compress(pack([1, 2, 3]))[:-4],
+    gzip.compress(pack([1, 2, 3])) + b'junk',
+    b'not gzip',
+])
+def test_bad_gzip_is_rejected(data):
+    stream = FrameStream(3)
+    with pytest.raises(ValueError):
+        stream.push(data, gzipped=True)
+    assert stream.received == 0
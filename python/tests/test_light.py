@@ -0,0 +1,81 @@
+import logging
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import fake_ws281x
+import neopixel
+from Pi import light
+from Pi.commands import CommandMailbox
+from Pi.framecache import FrameCache
+from Pi.message import SceneMessage
+
+
+@pytest.fixture
+def strip(monkeypatch):
+    monkeypatch.setattr(neopixel, 'ws', fake_ws281x)
+    monkeypatch.setattr(light, 'logger', logging.getLogger(light.LOGGER_NAME), raising=False)
+    strip = neopixel.Adafruit_NeoPixel(8, 18)
+    strip.begin()
+    monkeypatch.setattr(light, 'strip', strip)
+    return strip
+
+
+@pytest.fixture
+def scene(tmp_path):
+    cache = FrameCache(str(tmp_path))
+    yield cache.get('scene', 8, 10, 4, lambda i: np.full(8, i, dtype=np.uint32))
+    cache.close()
+
+
+def test_replay_sends_pre_encoded_frames_within_the_byte_budget(strip, scene, monkeypatch):
+    monkeypatch.setattr(light, 'PRE_ENCODE_MAX_BYTES', 4 * 8 * 9)
+    render = light.replay(scene)
+
+    frame = render(0.2)
+
+    assert isinstance(frame, neopixel.EncodedFrame)
+    assert frame._handle[1] == (2,) * 8
+
+
+def test_replay_renders_frame_by_frame_over_the_byte_budget(strip, scene, monkeypatch):
+    monkeypatch.setattr(light, 'PRE_ENCODE_MAX_BYTES', 4 * 8 * 9 - 1)
+    render = light.replay(scene)
+
+    assert render(0.2) is None
+    assert strip.getPixels()[:] == [2] * 8
+
+
+@pytest.fixture
+def render_thread(monkeypatch, tmp_path):
+    """ A fresh render thread, with the strip it creates backed by fake_ws281x. """
+    monkeypatch.setattr(neopixel, 'ws', fake_ws281x)
+    monkeypatch.setattr(light, 'logger', logging.getLogger(light.LOGGER_NAME), raising=False)
+    monkeypatch.setattr(light, 'frame_cache', FrameCache(str(tmp_path)))
+    monkeypatch.setattr(light, 'LED_COUNT', 8)
+    for name, value in (('strip', None), ('commands', CommandMailbox()), ('render_thread', None),
+                        ('pending_command', None), ('frame_scheduler', None),
+                        ('stop_event', threading.Event())):
+        monkeypatch.setattr(light, name, value)
+    yield
+    light.frame_cache.close()
+
+
+@pytest.mark.parametrize('time_based', [True, False])
+def test_stop_rendering_ends_a_running_animation(render_thread, monkeypatch, time_based):
+    monkeypatch.setattr(light, 'TIME_BASED_ANIMATIONS', time_based)
+    light.message_handler(SceneMessage({'Id': 'a', 'colors': ['#ff0000'], 'defaultBrightness': 100,
+                                        'animated': True, 'animation': 'TheaterChase'}))
+    deadline = time.monotonic() + 5
+    while light.frame_scheduler is None or not light.strip._leds.sent:
+        assert time.monotonic() < deadline, 'Animation never started'
+        time.sleep(0.01)
+
+    stopper = threading.Thread(target=light.stop_rendering, daemon=True)
+    stopper.start()
+    stopper.join(5)
+
+    assert not stopper.is_alive()
+    assert not light.render_thread.is_alive()
@@ -0,0 +1,45 @@
+import pytest
+
+import fake_ws281x
+import neopixel
+
+
+@pytest.fixture
+def strip(monkeypatch):
+    monkeypatch.setattr(neopixel, 'ws', fake_ws281x)
+    strip = neopixel.Adafruit_NeoPixel(8, 18, brightness=255, double_buffer=True)
+    strip.begin()
+    return strip
+
+
+def test_unchanged_show_is_skipped(strip):
+    strip.setPixelColor(0, 0xff0000)
+    strip.show()
+    strip.show()
+
+    assert len(strip._leds.sent) == 1
+    assert strip.getRenderStats() == {'issued': 1, 'skipped': 1}
+
+
+def test_unchanged_show_flushes_frame_queued_by_async_show(strip):
+    strip.setPixelColor(0, 0xff0000)
+    strip.show(block=False)
+    assert strip._leds.sent == []
+
+    strip.show()
+
+    assert strip._leds.pending is None
+    assert strip._leds.sent[-1][1][0] == 0xff0000
+    # Nothing left to send:
+    strip.show()
+    assert strip.getRenderStats() == {'issued': 2, 'skipped': 1}
+
+
+def test_wait_sends_frame_queued_by_async_show(strip):
+    strip.setPixelColor(0, 0x00ff00)
+    strip.show(block=False)
+    strip.wait()
+    strip.show()
+
+    assert [colors[0] for _, colors in strip._leds.sent] == [0x00ff00]
+    assert strip.getRenderStats() == {'issued': 1, 'skipped': 1}
@@ -49,6 +49,7 @@
 #include "pwm.h"
 #include "pcm.h"
 #include "rpihw.h"
+#include "encode.h"
 
 #include "ws2811.h"
 
@@ -72,14 +73,6 @@
                                                   RPI_PWM_CHANNELS)
 #define PCM_BYTE_COUNT(leds, freq)               ((((LED_BIT_COUNT(leds, freq) >> 3) & ~0x7) + 4) + 4)
 
-// Symbol definitions
-#define SYMBOL_HIGH                              0x6  // 1 1 0
-#define SYMBOL_LOW                               0x4  // 1 0 0
-
-// Symbol definitions for software inversion (PCM and SPI only)
-#define SYMBOL_HIGH_INV                          0x1  // 0 0 1
-#define SYMBOL_LOW_INV                           0x3  // 0 1 1
-
 // Driver mode definitions
 #define NONE	0
 #define PWM	1
@@ -99,10 +92,48 @@ typedef struct videocore_mbox {
     uint8_t *virt_addr;     /* From mapmem() */
 } videocore_mbox_t;
 
+// What a DMA buffer was last encoded from, per channel.  Lets a render
+// re-encode only the span of LEDs that changed since then.
+typedef struct ws2811_encoded
+{
+    ws2811_led_t *leds;                          // Copy of the LED values
+    int valid;                                   // Buffer matches leds and the settings below
+    int strip_type;
+    int invert;
+    uint8_t brightness;
+    uint8_t gamma[256];
+} ws2811_encoded_t;
+
+// A frame encoded ahead of time by ws2811_frame_capture(), ready to be copied
+// into a DMA buffer as-is.
+struct ws2811_frame
+{
+    int driver_mode;                             // Layout of data, PWM, PCM or SPI
+    size_t size;                                 // Bytes in data, one full DMA buffer
+    uint8_t *data;
+};
+
+// Color table of a channel (see encode_color_lut()) and the settings it was
+// built from, rebuilt only when they change.
+typedef struct ws2811_color_lut
+{
+    int valid;
+    int invert;
+    uint8_t brightness;
+    uint8_t gamma[256];
+    uint32_t symbols[256];
+} ws2811_color_lut_t;
+
 typedef struct ws2811_device
 {
     int driver_mode;
-    volatile uint8_t *pxl_raw;
+    volatile uint8_t *pxl_raw;                   // Buffer last handed to DMA/SPI
+    volatile uint8_t *pxl_back;                  // Buffer to encode into, same as pxl_raw unless double buffered
+    int pending;                                 // pxl_back holds a frame not yet started
+    int back;                                    // Index of pxl_back in encoded[]
+    ws2811_encoded_t encoded[2][RPI_PWM_CHANNELS];
+    ws2811_color_lut_t lut[RPI_PWM_CHANNELS];
+    uint64_t render_timestamp;                   // Time the last frame was started
     volatile dma_t *dma;
     volatile pwm_t *pwm;
     volatile pcm_t *pcm;
@@ -500,6 +531,9 @@ static void dma_start(ws2811_t *ws2811)
     volatile pcm_t *pcm = device->pcm;
     uint32_t dma_cb_addr = device->dma_cb_addr;
 
+    // Feed from whichever buffer holds the frame, DMA is idle at this point
+    device->dma_cb->source_ad = addr_to_bus(device, device->pxl_raw);
+
     dma->cs = RPI_DMA_CS_RESET;
     usleep(10);
 
@@ -579,6 +613,11 @@ void pwm_raw_init(ws2811_t *ws2811)
                     RPI_PWM_CHANNELS;
     int chan;
 
+    if (ws2811->device->pxl_back != ws2811->device->pxl_raw)
+    {
+        wordcount *= 2;
+    }
+
     for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
     {
         int i, wordpos = chan;
@@ -606,6 +645,11 @@ void pcm_raw_init(ws2811_t *ws2811)
     int wordcount = PCM_BYTE_COUNT(maxcount, ws2811->freq) / sizeof(uint32_t);
     int i;
 
+    if (ws2811->device->pxl_back != ws2811->device->pxl_raw)
+    {
+        wordcount *= 2;
+    }
+
     for (i = 0; i < wordcount; i++)
     {
         pxl_raw[i] = 0x0;
@@ -626,6 +670,11 @@ void ws2811_cleanup(ws2811_t *ws2811)
 
     for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
     {
+        if (device)
+        {
+            free(device->encoded[0][chan].leds);
+            free(device->encoded[1][chan].leds);
+        }
         if (ws2811->channel && ws2811->channel[chan].leds)
         {
             free(ws2811->channel[chan].leds);
@@ -661,6 +710,48 @@ void ws2811_cleanup(ws2811_t *ws2811)
     ws2811->device = NULL;
 }
 
+/**
+ * Allocate the per buffer copies of the LED values used to find what changed
+ * since a buffer was last encoded.
+ *
+ * @param    ws2811   ws2811 instance pointer.
+ * @param    buffers  Number of DMA buffers, 1 or 2.
+ *
+ * @returns  0 on success, -1 otherwise.
+ */
+static int encoded_init(ws2811_t *ws2811, int buffers)
+{
+    ws2811_device_t *device = ws2811->device;
+    int buf, chan;
+
+    for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+    {
+        device->lut[chan].valid = 0;
+    }
+
+    for (buf = 0; buf < buffers; buf++)
+    {
+        for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+        {
+            ws2811_encoded_t *encoded = &device->encoded[buf][chan];
+
+            encoded->valid = 0;
+            if (!ws2811->channel[chan].count)
+            {
+                continue;
+            }
+
+            encoded->leds = malloc(sizeof(ws2811_led_t) * ws2811->channel[chan].count);
+            if (!encoded->leds)
+            {
+                return -1;
+            }
+        }
+    }
+
+    return 0;
+}
+
 static int set_driver_mode(ws2811_t *ws2811, int gpionum)
 {
     int gpionum2;
@@ -845,14 +936,22 @@ static ws2811_return_t spi_init(ws2811_t *ws2811)
     channel->bshift = (channel->strip_type >> 0)  & 0xff;
 
     // Allocate SPI transmit buffer (same size as PCM)
+    // The transfer is synchronous, so a second buffer wouldn't overlap anything
     device->pxl_raw = malloc(PCM_BYTE_COUNT(device->max_count, ws2811->freq));
     if (device->pxl_raw == NULL)
     {
         ws2811_cleanup(ws2811);
         return WS2811_ERROR_OUT_OF_MEMORY;
     }
+    device->pxl_back = device->pxl_raw;
     pcm_raw_init(ws2811);
 
+    if (encoded_init(ws2811, 1))
+    {
+        ws2811_cleanup(ws2811);
+        return WS2811_ERROR_OUT_OF_MEMORY;
+    }
+
     return WS2811_SUCCESS;
 }
 
@@ -895,6 +994,7 @@ ws2811_return_t ws2811_init(ws2811_t *ws2811)
 {
     ws2811_device_t *device;
     const rpi_hw_t *rpi_hw;
+    uint32_t byte_count = 0;
     int chan;
 
     ws2811->rpi_hw = rpi_hw_detect();
@@ -912,6 +1012,8 @@ ws2811_return_t ws2811_init(ws2811_t *ws2811)
     memset(ws2811->device, 0, sizeof(*ws2811->device));
     device = ws2811->device;
 
+    encode_init();
+
     if (check_hwver_and_gpionum(ws2811) < 0)
     {
         return WS2811_ERROR_ILLEGAL_GPIO;
@@ -926,15 +1028,15 @@ ws2811_return_t ws2811_init(ws2811_t *ws2811)
     // Determine how much physical memory we need for DMA
     switch (device->driver_mode) {
     case PWM:
-        device->mbox.size = PWM_BYTE_COUNT(device->max_count, ws2811->freq) +
-                            sizeof(dma_cb_t);
+        byte_count = PWM_BYTE_COUNT(device->max_count, ws2811->freq);
         break;
 
     case PCM:
-        device->mbox.size = PCM_BYTE_COUNT(device->max_count, ws2811->freq) +
-                            sizeof(dma_cb_t);
+        byte_count = PCM_BYTE_COUNT(device->max_count, ws2811->freq);
         break;
     }
+    device->mbox.size = (ws2811->double_buffer ? 2 * byte_count : byte_count) +
+                        sizeof(dma_cb_t);
     // Round up to page size multiple
     device->mbox.size = (device->mbox.size + (PAGE_SIZE - 1)) & ~(PAGE_SIZE - 1);
 
@@ -970,6 +1072,7 @@ ws2811_return_t ws2811_init(ws2811_t *ws2811)
 
     // Initialize all pointers to NULL.  Any non-NULL pointers will be freed on cleanup.
     device->pxl_raw = NULL;
+    device->pxl_back = NULL;
     device->dma_cb = NULL;
     for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
     {
@@ -1014,6 +1117,18 @@ ws2811_return_t ws2811_init(ws2811_t *ws2811)
 
     device->dma_cb = (dma_cb_t *)device->mbox.virt_addr;
     device->pxl_raw = (uint8_t *)device->mbox.virt_addr + sizeof(dma_cb_t);
+    device->pxl_back = device->pxl_raw;
+    if (ws2811->double_buffer)
+    {
+        device->pxl_back = device->pxl_raw + byte_count;
+        device->back = 1;
+    }
+
+    if (encoded_init(ws2811, ws2811->double_buffer ? 2 : 1))
+    {
+        ws2811_cleanup(ws2811);
+        return WS2811_ERROR_OUT_OF_MEMORY;
+    }
 
     switch (device->driver_mode) {
     case PWM:
@@ -1097,64 +1212,148 @@ void ws2811_fini(ws2811_t *ws2811)
 }
 
 /**
- * Wait for any executing DMA operation to complete before returning.
+ * Get the color table of a channel for its current brightness and gamma
+ * table, rebuilding it if either changed since it was last used.
  *
- * @param    ws2811  ws2811 instance pointer.
+ * @param    ws2811   ws2811 instance pointer.
+ * @param    chan     Channel number.
+ * @param    invert   Non-zero to use the software inverted symbols.
  *
- * @returns  0 on success, -1 on DMA competion error
+ * @returns  The 256 entry table.
  */
-ws2811_return_t ws2811_wait(ws2811_t *ws2811)
+static const uint32_t *channel_lut(ws2811_t *ws2811, int chan, int invert)
 {
-    volatile dma_t *dma = ws2811->device->dma;
+    ws2811_channel_t *channel = &ws2811->channel[chan];
+    ws2811_color_lut_t *lut = &ws2811->device->lut[chan];
 
-    if (ws2811->device->driver_mode == SPI)  // Nothing to do for SPI
+    if (!lut->valid ||
+        (lut->brightness != channel->brightness) ||
+        (lut->invert != invert) ||
+        memcmp(lut->gamma, channel->gamma, sizeof(lut->gamma)))
     {
-        return WS2811_SUCCESS;
+        encode_color_lut(channel, invert, lut->symbols);
+        lut->brightness = channel->brightness;
+        lut->invert = invert;
+        memcpy(lut->gamma, channel->gamma, sizeof(lut->gamma));
+        lut->valid = 1;
     }
 
-    while ((dma->cs & RPI_DMA_CS_ACTIVE) &&
-           !(dma->cs & RPI_DMA_CS_ERROR))
+    return lut->symbols;
+}
+
+/**
+ * Encode LEDs first to last - 1 of a channel into a DMA buffer laid out for
+ * the driver mode in use.
+ *
+ * @param    ws2811   ws2811 instance pointer.
+ * @param    chan     Channel number.
+ * @param    pxl_raw  DMA buffer to encode into.
+ * @param    first    First LED to encode.
+ * @param    last     One past the last LED to encode.
+ *
+ * @returns  None
+ */
+static void encode_channel(ws2811_t *ws2811, int chan, volatile uint8_t *pxl_raw,
+                           int first, int last)
+{
+    ws2811_channel_t *channel = &ws2811->channel[chan];
+
+    // Inversion is handled by hardware for PWM, otherwise by software here
+    switch (ws2811->device->driver_mode)
     {
-        usleep(10);
+    case PWM:
+        // Every other word is on the same channel for PWM
+        encode_words(channel, channel_lut(ws2811, chan, 0),
+                     (volatile uint32_t *)pxl_raw + chan, RPI_PWM_CHANNELS, first, last);
+        break;
+    case PCM:
+        encode_words(channel, channel_lut(ws2811, chan, channel->invert),
+                     (volatile uint32_t *)pxl_raw, 1, first, last);
+        break;
+    case SPI:
+        encode_bytes(channel, channel_lut(ws2811, chan, channel->invert), pxl_raw, first, last);
+        break;
     }
+}
 
-    if (dma->cs & RPI_DMA_CS_ERROR)
+/**
+ * Encode the user supplied LED arrays of all channels into the back DMA
+ * buffer.  Only the span of LEDs that differs from what the buffer was last
+ * encoded from is re-encoded, unless a setting affecting every LED (brightness,
+ * gamma, strip type or inversion) has changed since.
+ *
+ * @param    ws2811   ws2811 instance pointer.
+ *
+ * @returns  None
+ */
+static void encode_channels(ws2811_t *ws2811)
+{
+    ws2811_device_t *device = ws2811->device;
+    volatile uint8_t *pxl_raw = device->pxl_back;
+    int chan;
+
+    for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)         // Channel
     {
-        fprintf(stderr, "DMA Error: %08x\n", dma->debug);
-        return WS2811_ERROR_DMA;
-    }
+        ws2811_channel_t *channel = &ws2811->channel[chan];
+        ws2811_encoded_t *encoded = &device->encoded[device->back][chan];
+        int first = 0, last = channel->count;
 
-    return WS2811_SUCCESS;
+        if (!channel->count)
+        {
+            continue;
+        }
+
+        if (encoded->valid &&
+            (encoded->brightness == channel->brightness) &&
+            (encoded->strip_type == channel->strip_type) &&
+            (encoded->invert == channel->invert) &&
+            !memcmp(encoded->gamma, channel->gamma, sizeof(encoded->gamma)))
+        {
+            while ((first < last) && (channel->leds[first] == encoded->leds[first]))
+            {
+                first++;
+            }
+            while ((last > first) && (channel->leds[last - 1] == encoded->leds[last - 1]))
+            {
+                last--;
+            }
+            if (first == last)
+            {
+                continue;
+            }
+        }
+        else
+        {
+            encoded->brightness = channel->brightness;
+            encoded->strip_type = channel->strip_type;
+            encoded->invert = channel->invert;
+            memcpy(encoded->gamma, channel->gamma, sizeof(encoded->gamma));
+            encoded->valid = 1;
+        }
+
+        encode_channel(ws2811, chan, pxl_raw, first, last);
+
+        memcpy(&encoded->leds[first], &channel->leds[first],
+               sizeof(ws2811_led_t) * (last - first));
+    }
 }
 
 /**
- * Render the DMA buffer from the user supplied LED arrays and start the DMA
- * controller.  This will update all LEDs on both PWM channels.
+ * Time it takes to clock out one frame, using the channel which takes the
+ * longest as both run in parallel.
  *
  * @param    ws2811  ws2811 instance pointer.
  *
- * @returns  None
+ * @returns  Protocol time in microseconds.
  */
-ws2811_return_t  ws2811_render(ws2811_t *ws2811)
+static uint32_t frame_protocol_time(ws2811_t *ws2811)
 {
-    volatile uint8_t *pxl_raw = ws2811->device->pxl_raw;
-    int driver_mode = ws2811->device->driver_mode;
-    int bitpos;
-    int i, k, l, chan;
-    unsigned j;
-    ws2811_return_t ret = WS2811_SUCCESS;
     uint32_t protocol_time = 0;
-    static uint64_t previous_timestamp = 0;
-
-    bitpos = (driver_mode == SPI ? 7 : 31);
+    int chan;
 
-    for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)         // Channel
+    for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
     {
         ws2811_channel_t *channel = &ws2811->channel[chan];
-
-        int wordpos = chan; // PWM & PCM
-        int bytepos = 0;    // SPI
-        const int scale = (channel->brightness & 0xff) + 1;
         uint8_t array_size = 3; // Assume 3 color LEDs, RGB
 
         // If our shift mask includes the highest nibble, then we have 4 LEDs, RBGW.
@@ -1166,95 +1365,68 @@ ws2811_return_t  ws2811_render(ws2811_t *ws2811)
         // 1.25µs per bit
         const uint32_t channel_protocol_time = channel->count * array_size * 8 * 1.25;
 
-        // Only using the channel which takes the longest as both run in parallel
         if (channel_protocol_time > protocol_time)
         {
             protocol_time = channel_protocol_time;
         }
+    }
 
-        for (i = 0; i < channel->count; i++)                // Led
-        {
-            uint8_t color[] =
-            {
-                channel->gamma[(((channel->leds[i] >> channel->rshift) & 0xff) * scale) >> 8], // red
-                channel->gamma[(((channel->leds[i] >> channel->gshift) & 0xff) * scale) >> 8], // green
-                channel->gamma[(((channel->leds[i] >> channel->bshift) & 0xff) * scale) >> 8], // blue
-                channel->gamma[(((channel->leds[i] >> channel->wshift) & 0xff) * scale) >> 8], // white
-            };
+    return protocol_time;
+}
 
-            for (j = 0; j < array_size; j++)               // Color
-            {
-                for (k = 7; k >= 0; k--)                   // Bit
-                {
-                    // Inversion is handled by hardware for PWM, otherwise by software here
-                    uint8_t symbol = SYMBOL_LOW;
-                    if ((driver_mode != PWM) && channel->invert) symbol = SYMBOL_LOW_INV;
-
-                    if (color[j] & (1 << k))
-                    {
-                        symbol = SYMBOL_HIGH;
-                        if ((driver_mode != PWM) && channel->invert) symbol = SYMBOL_HIGH_INV;
-                    }
-
-                    for (l = 2; l >= 0; l--)               // Symbol
-                    {
-                        uint32_t *wordptr = &((uint32_t *)pxl_raw)[wordpos];   // PWM & PCM
-                        volatile uint8_t  *byteptr = &pxl_raw[bytepos];    // SPI
-
-                        if (driver_mode == SPI)
-                        {
-                            *byteptr &= ~(1 << bitpos);
-                            if (symbol & (1 << l))
-                            {
-                                *byteptr |= (1 << bitpos);
-                            }
-                        }
-                        else  // PWM & PCM
-                        {
-                            *wordptr &= ~(1 << bitpos);
-                            if (symbol & (1 << l))
-                            {
-                                *wordptr |= (1 << bitpos);
-                            }
-                        }
-
-                        bitpos--;
-                        if (bitpos < 0)
-                        {
-                            if (driver_mode == SPI)
-                            {
-                                bytepos++;
-                                bitpos = 7;
-                            }
-                            else  // PWM & PCM
-                            {
-                                // Every other word is on the same channel for PWM
-                                wordpos += (driver_mode == PWM ? 2 : 1);
-                                bitpos = 31;
-                            }
-                        }
-                    }
-                }
-            }
-        }
-    }
+/**
+ * Check whether the previous frame is still being sent, including the reset
+ * time the LEDs need before the next one may start.
+ *
+ * @param    ws2811  ws2811 instance pointer.
+ *
+ * @returns  1 if busy, 0 if a new frame can be started.
+ */
+static int frame_busy(ws2811_t *ws2811)
+{
+    ws2811_device_t *device = ws2811->device;
 
-    // Wait for any previous DMA operation to complete.
-    if ((ret = ws2811_wait(ws2811)) != WS2811_SUCCESS)
+    if ((device->driver_mode != SPI) && (device->dma->cs & RPI_DMA_CS_ACTIVE))
     {
-        return ret;
+        return 1;
     }
 
+    return (ws2811->render_wait_time != 0) &&
+           (get_microsecond_timestamp() - device->render_timestamp < ws2811->render_wait_time);
+}
+
+/**
+ * Send the most recently encoded frame, swapping the buffers if double
+ * buffered.  Any previous DMA operation must have completed.
+ *
+ * @param    ws2811  ws2811 instance pointer.
+ *
+ * @returns  0 on success, -1 otherwise.
+ */
+static ws2811_return_t start_frame(ws2811_t *ws2811)
+{
+    ws2811_device_t *device = ws2811->device;
+    volatile uint8_t *pxl_front = device->pxl_back;
+    ws2811_return_t ret = WS2811_SUCCESS;
+
     if (ws2811->render_wait_time != 0) {
         const uint64_t current_timestamp = get_microsecond_timestamp();
-        uint64_t time_diff = current_timestamp - previous_timestamp;
+        uint64_t time_diff = current_timestamp - device->render_timestamp;
 
         if (ws2811->render_wait_time > time_diff) {
             usleep(ws2811->render_wait_time - time_diff);
         }
     }
 
-    if (driver_mode != SPI)
+    if (device->pxl_back != device->pxl_raw)
+    {
+        device->back ^= 1;
+    }
+    device->pxl_back = device->pxl_raw;
+    device->pxl_raw = pxl_front;
+    device->pending = 0;
+
+    if (device->driver_mode != SPI)
     {
         dma_start(ws2811);
     }
@@ -1264,12 +1436,294 @@ ws2811_return_t  ws2811_render(ws2811_t *ws2811)
     }
 
     // LED_RESET_WAIT_TIME is added to allow enough time for the reset to occur.
-    previous_timestamp = get_microsecond_timestamp();
-    ws2811->render_wait_time = protocol_time + LED_RESET_WAIT_TIME;
+    device->render_timestamp = get_microsecond_timestamp();
+    ws2811->render_wait_time = frame_protocol_time(ws2811) + LED_RESET_WAIT_TIME;
 
     return ret;
 }
 
+/**
+ * Wait for the executing DMA operation to complete.  Sleeps through the
+ * expected transfer time rather than polling the DMA controller for all of it.
+ *
+ * @param    ws2811  ws2811 instance pointer.
+ *
+ * @returns  0 on success, -1 on DMA competion error
+ */
+static ws2811_return_t dma_wait(ws2811_t *ws2811)
+{
+    ws2811_device_t *device = ws2811->device;
+    volatile dma_t *dma = device->dma;
+
+    if (dma->cs & RPI_DMA_CS_ACTIVE)
+    {
+        uint64_t elapsed = get_microsecond_timestamp() - device->render_timestamp;
+        uint64_t transfer_time = frame_protocol_time(ws2811);
+
+        if (transfer_time > elapsed)
+        {
+            usleep(transfer_time - elapsed);
+        }
+    }
+
+    while ((dma->cs & RPI_DMA_CS_ACTIVE) &&
+           !(dma->cs & RPI_DMA_CS_ERROR))
+    {
+        usleep(10);
+    }
+
+    if (dma->cs & RPI_DMA_CS_ERROR)
+    {
+        fprintf(stderr, "DMA Error: %08x\n", dma->debug);
+        return WS2811_ERROR_DMA;
+    }
+
+    return WS2811_SUCCESS;
+}
+
+/**
+ * Wait for any executing DMA operation to complete before returning.  A frame
+ * queued by ws2811_render_async() is started and waited for as well.
+ *
+ * @param    ws2811  ws2811 instance pointer.
+ *
+ * @returns  0 on success, -1 on DMA competion error
+ */
+ws2811_return_t ws2811_wait(ws2811_t *ws2811)
+{
+    ws2811_return_t ret;
+
+    if (ws2811->device->driver_mode == SPI)  // Nothing to do for SPI
+    {
+        return WS2811_SUCCESS;
+    }
+
+    if ((ret = dma_wait(ws2811)) != WS2811_SUCCESS)
+    {
+        return ret;
+    }
+
+    if (ws2811->device->pending)
+    {
+        if ((ret = start_frame(ws2811)) != WS2811_SUCCESS)
+        {
+            return ret;
+        }
+
+        return dma_wait(ws2811);
+    }
+
+    return WS2811_SUCCESS;
+}
+
+/**
+ * Render the DMA buffer from the user supplied LED arrays and start the DMA
+ * controller.  This will update all LEDs on both PWM channels.  When double
+ * buffered, the frame is encoded while the previous one is still being sent.
+ *
+ * @param    ws2811  ws2811 instance pointer.
+ *
+ * @returns  None
+ */
+ws2811_return_t  ws2811_render(ws2811_t *ws2811)
+{
+    ws2811_return_t ret;
+
+    // Replaces any frame still queued by ws2811_render_async()
+    encode_channels(ws2811);
+
+    // Wait for any previous DMA operation to complete.
+    if (ws2811->device->driver_mode != SPI)
+    {
+        if ((ret = dma_wait(ws2811)) != WS2811_SUCCESS)
+        {
+            return ret;
+        }
+    }
+
+    return start_frame(ws2811);
+}
+
+/**
+ * Render the user supplied LED arrays without blocking on the previous frame.
+ * Requires double buffering (falls back to ws2811_render() otherwise): the
+ * frame is encoded into the spare DMA buffer and started right away if the
+ * hardware is idle, else it is queued and started by the next call to
+ * ws2811_render_async() or ws2811_wait().  A queued frame that hasn't started
+ * yet is replaced by a newer one.
+ *
+ * @param    ws2811  ws2811 instance pointer.
+ *
+ * @returns  0 on success, -1 otherwise.
+ */
+ws2811_return_t ws2811_render_async(ws2811_t *ws2811)
+{
+    ws2811_device_t *device = ws2811->device;
+    ws2811_return_t ret;
+
+    if ((device->driver_mode == SPI) || (device->pxl_back == device->pxl_raw))
+    {
+        return ws2811_render(ws2811);
+    }
+
+    if (device->dma->cs & RPI_DMA_CS_ERROR)
+    {
+        fprintf(stderr, "DMA Error: %08x\n", device->dma->debug);
+        return WS2811_ERROR_DMA;
+    }
+
+    // Get the queued frame going first so its buffer is free to encode into
+    if (device->pending && !frame_busy(ws2811))
+    {
+        if ((ret = start_frame(ws2811)) != WS2811_SUCCESS)
+        {
+            return ret;
+        }
+    }
+
+    encode_channels(ws2811);
+    device->pending = 1;
+
+    if (!frame_busy(ws2811))
+    {
+        return start_frame(ws2811);
+    }
+
+    return WS2811_SUCCESS;
+}
+
+/**
+ * Size of one DMA buffer (the SPI transmit buffer for SPI).
+ *
+ * @param    ws2811  ws2811 instance pointer.
+ *
+ * @returns  Size in bytes.
+ */
+static size_t frame_byte_count(ws2811_t *ws2811)
+{
+    ws2811_device_t *device = ws2811->device;
+
+    if (device->driver_mode == PWM)
+    {
+        return PWM_BYTE_COUNT(device->max_count, ws2811->freq);
+    }
+
+    return PCM_BYTE_COUNT(device->max_count, ws2811->freq);
+}
+
+/**
+ * Encode the user supplied LED arrays of all channels, with the current
+ * brightness, gamma and strip settings, into a frame that can be sent any
+ * number of times by ws2811_frame_render() without encoding it again.  The
+ * DMA buffers and the hardware are left untouched.
+ *
+ * @param    ws2811  ws2811 instance pointer.
+ *
+ * @returns  The frame, to be freed with ws2811_frame_free(), or NULL if out of
+ *           memory.
+ */
+ws2811_frame_t *ws2811_frame_capture(ws2811_t *ws2811)
+{
+    ws2811_frame_t *frame;
+    int chan;
+
+    frame = malloc(sizeof(*frame));
+    if (!frame)
+    {
+        return NULL;
+    }
+
+    frame->driver_mode = ws2811->device->driver_mode;
+    frame->size = frame_byte_count(ws2811);
+    // Start from zeros, the idle level between frames
+    frame->data = calloc(1, frame->size);
+    if (!frame->data)
+    {
+        free(frame);
+        return NULL;
+    }
+
+    for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+    {
+        if (ws2811->channel[chan].count)
+        {
+            encode_channel(ws2811, chan, frame->data, 0, ws2811->channel[chan].count);
+        }
+    }
+
+    return frame;
+}
+
+/**
+ * Send a frame from ws2811_frame_capture() to the hardware, copying it into
+ * the DMA buffer in place of encoding the LED arrays.  Blocks like
+ * ws2811_render() and replaces any frame queued by ws2811_render_async().
+ *
+ * @param    ws2811  ws2811 instance pointer.
+ * @param    frame   Frame captured from the same ws2811 instance.
+ *
+ * @returns  0 on success, -1 otherwise.
+ */
+ws2811_return_t ws2811_frame_render(ws2811_t *ws2811, const ws2811_frame_t *frame)
+{
+    ws2811_device_t *device = ws2811->device;
+    ws2811_return_t ret;
+    int chan;
+
+    if (!frame || (frame->driver_mode != device->driver_mode) ||
+        (frame->size != frame_byte_count(ws2811)))
+    {
+        return WS2811_ERROR_GENERIC;
+    }
+
+    memcpy((uint8_t *)device->pxl_back, frame->data, frame->size);
+
+    // The buffer no longer matches the LED arrays; the next ws2811_render()
+    // encodes it in full
+    for (chan = 0; chan < RPI_PWM_CHANNELS; chan++)
+    {
+        device->encoded[device->back][chan].valid = 0;
+    }
+
+    if (device->driver_mode != SPI)
+    {
+        if ((ret = dma_wait(ws2811)) != WS2811_SUCCESS)
+        {
+            return ret;
+        }
+    }
+
+    return start_frame(ws2811);
+}
+
+/**
+ * Free a frame from ws2811_frame_capture().
+ *
+ * @param    frame  Frame to free, may be NULL.
+ *
+ * @returns  None
+ */
+void ws2811_frame_free(ws2811_frame_t *frame)
+{
+    if (frame)
+    {
+        free(frame->data);
+        free(frame);
+    }
+}
+
+/**
+ * Size of the encoded data held by a frame from ws2811_frame_capture().
+ *
+ * @param    frame  Frame, may be NULL.
+ *
+ * @returns  Bytes of encoded data, one full DMA buffer, or 0 for NULL.
+ */
+size_t ws2811_frame_size(const ws2811_frame_t *frame)
+{
+    return frame ? frame->size : 0;
+}
+
 const char * ws2811_get_return_t_str(const ws2811_return_t state)
 {
     const int index = -state;
@@ -35,6 +35,8 @@
 extern "C" {
 #endif
 
+#include <stddef.h>
+
 #include "rpihw.h"
 #include "pwm.h"
 
@@ -64,6 +66,7 @@ extern "C" {
 #define SK6812W_STRIP                            SK6812_STRIP_GRBW
 
 struct ws2811_device;
+typedef struct ws2811_frame ws2811_frame_t;      //< Pre-encoded frame, see ws2811_frame_capture()
 
 typedef uint32_t ws2811_led_t;                   //< 0xWWRRGGBB
 typedef struct ws2811_channel_t
@@ -89,6 +92,7 @@ typedef struct ws2811_t
     uint32_t freq;                               //< Required output frequency
     int dmanum;                                  //< DMA number _not_ already in use
     ws2811_channel_t channel[RPI_PWM_CHANNELS];
+    int double_buffer;                           //< Non-zero to encode into a second DMA buffer while the first is sent
 } ws2811_t;
 
 #define WS2811_RETURN_STATES(X)                                                             \
@@ -120,7 +124,13 @@ typedef enum {
 ws2811_return_t ws2811_init(ws2811_t *ws2811);                         //< Initialize buffers/hardware
 void ws2811_fini(ws2811_t *ws2811);                                    //< Tear it all down
 ws2811_return_t ws2811_render(ws2811_t *ws2811);                       //< Send LEDs off to hardware
+ws2811_return_t ws2811_render_async(ws2811_t *ws2811);                 //< Queue LEDs for hardware without blocking
 ws2811_return_t ws2811_wait(ws2811_t *ws2811);                         //< Wait for DMA completion
+ws2811_frame_t *ws2811_frame_capture(ws2811_t *ws2811);                //< Encode the LEDs once for replay
+ws2811_return_t ws2811_frame_render(ws2811_t *ws2811,
+                                    const ws2811_frame_t *frame);      //< Send a captured frame to hardware
+void ws2811_frame_free(ws2811_frame_t *frame);                         //< Free a captured frame
+size_t ws2811_frame_size(const ws2811_frame_t *frame);                 //< Bytes held by a captured frame
 const char * ws2811_get_return_t_str(const ws2811_return_t state);     //< Get string representation of the given return state
 
 #ifdef __cplusplus